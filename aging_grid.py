@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+import commodity_classifier
+import trade_trace
+
+# Share of output that depends on the (aging) workforce, per classifier sector
+SECTOR_LABOR_INTENSITY = {
+    "agricultural": 0.7,
+    "labor_intensive": 0.9,
+    "mineral": 0.4,
+    "chemical": 0.4,
+    "metals": 0.6,
+    "machinery": 0.8,
+    "vehicles": 0.8,
+    "other": 0.5,
+}
+SECTORS = commodity_classifier.SECTORS + ["other"]
+
+
+def productivity_decline(median_age_increase, labor_intensity, decline_per_year=0.02, floor=0.5):
+    """Fraction of productivity lost; broadcasts ages against intensities
+
+    Productivity falls by `decline_per_year` (2%) per year of median-age
+    increase, scaled by the labor intensity, and never drops below `floor`
+    (50%) of its current level, so the loss is capped at 1 - floor.
+    """
+    return np.minimum(1 - floor, decline_per_year * np.asarray(median_age_increase) * np.asarray(labor_intensity))
+
+
+def chapter_sector(chapter):
+    """First classifier sector whose HS chapter ranges contain `chapter`, else 'other'"""
+    for sector, ranges in commodity_classifier.HS_CHAPTERS.items():
+        if any(lo <= chapter <= hi for lo, hi in ranges):
+            return sector
+    return "other"
+
+
+# Grid columns: every two-digit HS chapter, then one bucket per keyword sector for
+# codes without a chapter (TOTAL, national codes). Fixed so partial grids line up.
+CHAPTERS = [f"{c:02d}" for c in range(1, 100)] + SECTORS
+CHAPTER_SECTORS = [chapter_sector(int(c)) if c.isdigit() else c for c in CHAPTERS]
+
+
+def export_chapter_matrix(df, country_col="Country", value_col="import_value_numeric",
+                          code_col="cmdCode", desc_col="cmdDesc"):
+    """[country, CHAPTERS] export values for every exporter and commodity
+
+    Returns (values, countries).
+    """
+    code_ids, codes = pd.factorize(df[code_col], use_na_sentinel=False)
+    code_chapters = np.array([commodity_classifier.hs_chapter(c) or 0 for c in codes], dtype=np.intp)
+    column = code_chapters[code_ids] - 1
+
+    # Keyword sector bucket for rows without an HS chapter
+    no_chapter = column < 0
+    if no_chapter.any():
+        flags = commodity_classifier.sector_flags(df[no_chapter], code_col, desc_col).to_numpy()
+        sector = np.where(flags.any(axis=1), flags.argmax(axis=1), SECTORS.index("other"))
+        column[no_chapter] = 99 + sector
+
+    c_codes, countries = pd.factorize(df[country_col], sort=True)
+    values = np.zeros((len(countries), len(CHAPTERS)))
+    v = pd.to_numeric(df[value_col], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+    keep = c_codes >= 0
+    np.add.at(values, (c_codes[keep], column[keep]), v[keep])
+    return values, np.asarray(countries)
+
+
+def sector_totals(values):
+    """Collapse the last (CHAPTERS) axis of `values` to SECTORS"""
+    membership = np.array([[cs == s for s in SECTORS] for cs in CHAPTER_SECTORS], dtype=np.float64)
+    return values @ membership
+
+
+@trade_trace.traced("aging.grid")
+def value_at_risk(values, ages):
+    """[country, chapter, age] export value at risk and [chapter, age] decline, in one broadcast"""
+    intensity = np.array([SECTOR_LABOR_INTENSITY[s] for s in CHAPTER_SECTORS])
+    decline = productivity_decline(np.asarray(ages)[None, :], intensity[:, None])
+    return values[:, :, None] * decline[None, :, :], decline
+
+
+def risk_frame(cube, values, countries, ages):
+    """Long Country/Chapter/AgeIncrease table with value at risk and its share of total exports"""
+    totals = values.sum(axis=1)[:, None, None]
+    share = np.divide(cube, totals, out=np.zeros_like(cube), where=totals != 0)
+    index = pd.MultiIndex.from_product([countries, CHAPTERS, ages], names=["Country", "Chapter", "AgeIncrease"])
+    frame = pd.DataFrame({"ValueAtRisk": cube.ravel(), "ShareOfExports": share.ravel()}, index=index).reset_index()
+    frame.insert(2, "Sector", np.repeat(np.tile(CHAPTER_SECTORS, len(countries)), len(ages)))
+    return frame
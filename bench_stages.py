@@ -0,0 +1,164 @@
+import argparse
+import csv
+import os
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+import commodity_classifier
+import synth_comtrade
+import trade_cache
+import trade_concentration
+import trade_graph
+import trade_resilience
+import trade_shocks
+import trade_stream
+import trade_tensor
+
+BENCH_DIR = ".bench_data"
+RESULTS_PATH = "bench_results.csv"
+RESULT_FIELDS = ["timestamp", "commit", "size", "rows", "stage", "seconds", "peak_mb", "out_rows"]
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _measure(fn):
+    """(result, seconds, peak MB of Python/NumPy allocations) for one stage
+
+    The stage runs twice: once without tracemalloc for the wall time,
+    then again under tracemalloc for the peak, since tracing allocations
+    slows Python-heavy stages several times over.
+    """
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, seconds, peak / 2**20
+
+
+def dataset(size):
+    """Path of the synthetic file for a preset, generating it on first use"""
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    path = os.path.join(BENCH_DIR, f"synth-{size}.csv")
+    if not os.path.exists(path):
+        reporters, partners, years, hs_codes, density = synth_comtrade.PRESETS[size]
+        print(f"Generating {size} dataset...")
+        synth_comtrade.generate(path, reporters, partners, years, hs_codes, density, export_share=0.3)
+    return path
+
+
+# ====== Stages ======
+def _rows(result):
+    """Output size of a stage: rows, non-zero cells or edges"""
+    if isinstance(result, trade_tensor.TradeTensor):
+        return int(np.count_nonzero(result.values))
+    if isinstance(result, tuple):
+        return int(result[0].nnz)
+    if isinstance(result, str):
+        return 1
+    return len(result)
+
+
+def run_stages(path, pivots=50, magnitudes=np.arange(0.05, 1.0001, 0.05)):
+    """Yield (stage, result rows, seconds, peak_mb) for each pipeline stage in order"""
+    def stage(name, fn):
+        result, seconds, peak = _measure(fn)
+        return result, (name, _rows(result), seconds, peak)
+
+    _, row = stage("cache_build", lambda: trade_cache.build_cache(path))
+    yield row
+    columns = ["reporterISO", "partnerISO", "Year", "primaryValue", "Country", "partnerDesc", "cmdCode", "cmdDesc"]
+    df, row = stage("load", lambda: trade_cache.load(columns, path=path))
+    yield row
+    agg, row = stage("aggregate", lambda: trade_stream.cached_exports(path))
+    yield row
+
+    def shares():
+        tensor = trade_tensor.build_tensor(agg)
+        trade_tensor.export_shares(tensor)
+        trade_tensor.import_shares(tensor)
+        return tensor
+    tensor, row = stage("shares", shares)
+    yield row
+
+    def concentration():
+        ag = df[commodity_classifier.sector_flags(df)["agricultural"].to_numpy()]
+        return trade_concentration.partner_concentration(ag, ["Country", "Year"], "partnerDesc", "primaryValue")
+    _, row = stage("concentration", concentration)
+    yield row
+
+    latest = tensor.years.max()
+    (A, isos), row = stage("graph_build", lambda: trade_graph.adjacency(agg, latest))
+    yield row
+    G = trade_graph.to_networkx(A, isos)
+    _, row = stage("centrality", lambda: trade_resilience.betweenness(G, pivots))
+    yield row
+
+    scenarios = trade_shocks.sweep_scenarios(tensor, magnitudes, years=[latest])
+    _, row = stage("scenarios", lambda: trade_shocks.evaluate(tensor, scenarios)[0])
+    yield row
+
+
+# ====== Results file ======
+def previous_results(path=RESULTS_PATH):
+    """Latest (size, stage) -> seconds from earlier runs"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, newline="") as f:
+        return {(r["size"], r["stage"]): float(r["seconds"]) for r in csv.DictReader(f)}
+
+
+def append_results(rows, path=RESULTS_PATH):
+    new_file = not os.path.exists(path)
+    with open(path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        if new_file:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stage-level benchmarks over synthetic Comtrade sizes")
+    parser.add_argument("--sizes", default="tiny,small", help=f"comma-separated presets: {','.join(synth_comtrade.PRESETS)}")
+    parser.add_argument("--pivots", type=int, default=50, help="betweenness pivots (0 for exact)")
+    parser.add_argument("--results", default=RESULTS_PATH)
+    parser.add_argument("--regression", type=float, default=1.25, help="flag stages slower than this ratio")
+    args = parser.parse_args()
+
+    before = previous_results(args.results)
+    stamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    commit = _commit()
+    rows = []
+    for size in args.sizes.split(","):
+        path = dataset(size)
+        print(f"\n=== {size} ===")
+        for stage, out_rows, seconds, peak in run_stages(path, args.pivots or None):
+            if stage == "cache_build":
+                n_rows = trade_cache.ensure_cache(path)[1]["rows"]
+            old = before.get((size, stage))
+            flag = ""
+            if old:
+                ratio = seconds / old
+                slower = ratio > args.regression and seconds > 0.05  # ignore timer noise on tiny stages
+                flag = f"  ({ratio:.2f}x previous{' REGRESSION' if slower else ''})"
+            print(f"{stage:<14}{seconds:>10.3f}s {peak:>10.1f} MB {out_rows:>12,} rows{flag}")
+            rows.append({"timestamp": stamp, "commit": commit, "size": size, "rows": n_rows,
+                         "stage": stage, "seconds": round(seconds, 6), "peak_mb": round(peak, 3),
+                         "out_rows": out_rows})
+    append_results(rows, args.results)
+    print(f"\nAppended {len(rows)} results to {args.results}")
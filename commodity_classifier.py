@@ -0,0 +1,79 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+import trade_trace
+
+# ====== Sector definitions ======
+# HS chapter ranges (inclusive) per sector; a code can belong to several sectors
+HS_CHAPTERS = {
+    "agricultural": [(1, 24)],
+    "labor_intensive": [(41, 43), (44, 46), (47, 49), (50, 63), (64, 67), (94, 96)],
+    "mineral": [(25, 27)],
+    "chemical": [(28, 40)],
+    "metals": [(72, 83)],
+    "machinery": [(84, 85)],
+    "vehicles": [(86, 89)],
+}
+
+# Fallback for codes without an HS chapter (TOTAL, national codes, ...)
+SECTOR_KEYWORDS = {
+    "agricultural": [
+        'food', 'grain', 'wheat', 'rice', 'corn', 'soy', 'meat', 'dairy',
+        'fruit', 'vegetable', 'sugar', 'coffee', 'tea', 'fish', 'agricultural',
+        'livestock', 'poultry', 'beef', 'pork', 'milk', 'cheese', 'cereals'
+    ],
+    "labor_intensive": [
+        'textile', 'clothing', 'footwear', 'furniture', 'toy', 'leather',
+        'wood', 'paper', 'manufacturing', 'assembly', 'garment'
+    ],
+}
+
+SECTORS = list(HS_CHAPTERS)
+
+
+def hs_chapter(code):
+    """Two-digit HS chapter of a commodity code, or None
+
+    HS codes have an even number of digits; a code read as a number loses
+    its leading zero (0403 -> 403 or 403.0), so odd-length codes are padded
+    back before taking the chapter.
+    """
+    code = str(code).strip()
+    if code.endswith(".0") and code[:-2].isdigit():
+        code = code[:-2]
+    if code.isdigit() and len(code) % 2:
+        code = "0" + code
+    if len(code) >= 2 and code[:2].isdigit():
+        return int(code[:2])
+    return None
+
+
+@lru_cache(maxsize=None)
+def classify_commodity(code, desc):
+    """Sector flags for one commodity, in SECTORS order"""
+    chapter = hs_chapter(code)
+    if chapter is not None:
+        return tuple(
+            any(lo <= chapter <= hi for lo, hi in HS_CHAPTERS[sector]) for sector in SECTORS
+        )
+    desc = str(desc).lower() if isinstance(desc, str) else ""
+    return tuple(
+        any(k in desc for k in SECTOR_KEYWORDS.get(sector, [])) for sector in SECTORS
+    )
+
+
+@trade_trace.traced("classify")
+def sector_flags(df, code_col="cmdCode", desc_col="cmdDesc"):
+    """Boolean sector columns for every row of df
+
+    Each distinct (code, description) pair is classified once and the
+    result is broadcast back to rows through the factorized pair codes.
+    """
+    pairs = pd.MultiIndex.from_arrays([df[code_col], df[desc_col]])
+    codes, uniques = pd.factorize(pairs, use_na_sentinel=False)
+    table = np.array(
+        [classify_commodity(code, desc) for code, desc in uniques], dtype=bool
+    ).reshape(len(uniques), len(SECTORS))
+    return pd.DataFrame(table[codes], columns=SECTORS, index=df.index)
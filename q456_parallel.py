@@ -0,0 +1,208 @@
+import argparse
+import importlib.util
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+import trade_cache
+import trade_trace
+
+QUESTIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "question-4,5,6.py")
+
+
+def load_questions(path=QUESTIONS_PATH):
+    """Import question-4,5,6.py, whose name is not a valid module name"""
+    spec = importlib.util.spec_from_file_location("question_456", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ====== Shared-memory frame ======
+def share_frame(df):
+    """Copy df's columns into one shared-memory block
+
+    Numeric and bool columns are copied as they are. Everything else
+    (object, string, categorical) is stored as categorical codes and rebuilt
+    from the categories on attach, so no Python object pointers end up in
+    shared memory. Returns (shm, spec); the caller owns shm and must close
+    and unlink it.
+    """
+    arrays, spec, offset = [], [], 0
+    for name in df.columns:
+        col = df[name]
+        numeric = pd.api.types.is_numeric_dtype(col.dtype) or pd.api.types.is_bool_dtype(col.dtype)
+        if not numeric and not isinstance(col.dtype, pd.CategoricalDtype):
+            col = col.astype("category")
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            values, categories = col.cat.codes.to_numpy(), list(col.cat.categories)
+        else:
+            values, categories = col.to_numpy(), None
+            if values.dtype.hasobject:
+                raise TypeError(f"column {name!r} has no fixed-width dtype to share: {col.dtype}")
+        offset = -(-offset // 8) * 8  # keep every column 8-byte aligned
+        spec.append((name, values.dtype.str, offset, len(values), categories))
+        arrays.append((offset, values))
+        offset += values.nbytes
+
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for (start, values), (_, dtype, _, n, _) in zip(arrays, spec):
+        np.ndarray(n, dtype=dtype, buffer=shm.buf, offset=start)[:] = values
+    return shm, spec
+
+
+def attach_frame(buf, spec):
+    """DataFrame whose numeric columns and category codes are views into `buf`"""
+    data = {}
+    for name, dtype, offset, n, categories in spec:
+        values = np.ndarray(n, dtype=dtype, buffer=buf, offset=offset)
+        if categories is not None:
+            # Codes were valid when shared; skipping validation keeps them a view
+            values = pd.Categorical.from_codes(values, dtype=pd.CategoricalDtype(categories), validate=False)
+        data[name] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def country_blocks(countries, parts):
+    """[start, stop) row ranges over country-sorted rows, split on country boundaries
+
+    Block sizes are balanced by row count; a country is never split.
+    """
+    codes = np.asarray(countries)
+    if len(codes) == 0:
+        return []
+    bounds = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+    targets = np.linspace(0, len(codes), parts + 1)[1:-1]
+    cuts = np.unique(bounds[np.clip(np.searchsorted(bounds, targets), 0, len(bounds) - 1)]) if len(bounds) else []
+    edges = [0, *cuts, len(codes)]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+# ====== Workers ======
+_Q = None
+_SHM = None
+_FRAME = None
+
+
+def _init_worker(shm_name, spec):
+    global _Q, _SHM, _FRAME
+    _Q = load_questions()
+    _SHM = shared_memory.SharedMemory(name=shm_name)
+    _FRAME = attach_frame(_SHM.buf, spec)
+
+
+@trade_trace.worker_task
+def _run(task):
+    """Run one (analysis, args) task; row blocks are zero-copy slices of the shared frame"""
+    kind, args = task
+    if kind == "agricultural":
+        start, stop = args
+        return _Q.agricultural_dependency(_FRAME.iloc[start:stop])
+    if kind == "aging":
+        start, stop = args
+        return _Q.export_aging_exposure(_FRAME.iloc[start:stop])
+    if kind == "youth":
+        position, mc_draws = args
+        return _Q.youth_projection(_Q.YOUTH_COUNTRIES[position:position + 1], mc_draws, offset=position)
+    raise ValueError(f"unknown task {kind!r}")
+
+
+# ====== Merging ======
+def merge_agricultural(parts):
+    """Concatenate per-block agricultural_dependency results in country order"""
+    parts = [p for p in parts if p is not None]
+    if not parts:
+        return None
+    return {
+        "high_dependency": pd.concat([p["high_dependency"] for p in parts], ignore_index=True),
+        "countries": np.concatenate([p["countries"] for p in parts]),
+        "disruption": np.concatenate([p["disruption"] for p in parts], axis=1),
+    }
+
+
+def merge_aging(parts):
+    """Concatenate per-block export_aging_exposure results in country order"""
+    parts = [p for p in parts if p is not None]
+    if not parts:
+        return None
+    return {
+        "labor_exports": pd.concat([p["labor_exports"] for p in parts], ignore_index=True),
+        "chapter_values": np.vstack([p["chapter_values"] for p in parts]),
+        "countries": np.concatenate([p["countries"] for p in parts]),
+    }
+
+
+def merge_youth(parts):
+    """Concatenate per-country youth_projection results in list order"""
+    high_risk = [c for p in parts for c in p[0]]
+    mcs = [p[1] for p in parts if p[1] is not None]
+    return high_risk, pd.concat(mcs, ignore_index=True) if mcs else None
+
+
+def run_parallel(path=trade_cache.DATA_PATH, processes=None, parts=None, mc_draws=1_000_000):
+    """Run the three question-4,5,6 analyses across worker processes and print one report
+
+    The data is loaded once, sorted by country and copied into shared
+    memory; workers attach to it and analyse blocks of whole countries.
+    Every analysis only combines rows of the same country, so the merged
+    blocks equal a single-process run, and the report is printed in a fixed
+    order after all tasks finish.
+
+    Blocks are by country, not by year: each analysis aggregates a country
+    across all years (partner shares, export shares), so a per-year split
+    would change the results.
+    """
+    q = load_questions()
+    with trade_trace.stage("q456.load_sorted"):
+        df = q.load_data(path)
+        df = df.iloc[np.argsort(df["Country"].cat.codes.to_numpy(), kind="stable")].reset_index(drop=True)
+
+    processes = processes or os.cpu_count()
+    blocks = country_blocks(df["Country"].cat.codes.to_numpy(), parts or 4 * processes)
+    tasks = (
+        [("agricultural", b) for b in blocks]
+        + [("aging", b) for b in blocks]
+        + [("youth", (i, mc_draws)) for i in range(len(q.YOUTH_COUNTRIES))]
+    )
+
+    shm, spec = share_frame(df)
+    del df
+    try:
+        with trade_trace.stage("q456.parallel", rows_in=len(tasks)):
+            with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(shm.name, spec)) as pool:
+                results = list(pool.map(_run, tasks))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    n = len(blocks)
+    print("=" * 80)
+    print("QUESTION 1: AGRICULTURAL IMPORT DEPENDENCY ANALYSIS")
+    print("=" * 80)
+    q.report_agricultural_dependency(merge_agricultural(results[:n]))
+
+    print("=" * 80)
+    print("QUESTION 2: YOUTH UNEMPLOYMENT PREDICTION FOR 2030")
+    print("=" * 80)
+    print("  NOTE: Trade data lacks demographic/employment data. Using framework with example data.")
+    high_risk, mc = merge_youth(results[2 * n:])
+    q.report_youth_unemployment(high_risk, mc, mc_draws)
+
+    print("=" * 80)
+    print("QUESTION 3: EXPORT SECTORS AT RISK FROM AGING DEMOGRAPHICS")
+    print("=" * 80)
+    q.report_export_aging_risk(merge_aging(results[n:2 * n]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the question-4,5,6 analyses in parallel over shared memory")
+    parser.add_argument("--data", default=trade_cache.DATA_PATH)
+    parser.add_argument("--processes", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--parts", type=int, help="country blocks per analysis (default: 4 per process)")
+    parser.add_argument("--mc-draws", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    run_parallel(args.data, args.processes, args.parts, args.mc_draws)
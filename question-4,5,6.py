@@ -1,10 +1,40 @@
+import numpy as np
 import pandas as pd
+import aging_grid
+import commodity_classifier
+import trade_bans
+import trade_cache
+import trade_concentration
+import trade_trace
+import youth_montecarlo
+
+DATA_COLUMNS = ['Country', 'partnerDesc', 'flowDesc', 'cmdCode', 'cmdDesc', 'import_value', 'primaryValue']
+
+# Food security ban scenarios for Question 1
+BAN_SCENARIOS = [
+    {'name': 'Major Grain Exporters Ban', 'banned_partners': ['United States', 'Russian Federation', 'Ukraine', 'Argentina']},
+    {'name': 'Regional Crisis', 'banned_partners': ['China', 'India', 'Brazil']},
+    {'name': 'Climate Emergency', 'banned_partners': ['Australia', 'Canada', 'United States']}
+]
+
+# Example countries with current data for Question 2 (would need real data sources)
+YOUTH_COUNTRIES = [
+    {'country': 'Spain', 'base_youth_unemployment': 32.5, 'gdp_growth': 1.2, 'econ_structure': 0.7, 'education': 0.8},
+    {'country': 'Italy', 'base_youth_unemployment': 29.8, 'gdp_growth': 0.8, 'econ_structure': 0.6, 'education': 0.7},
+    {'country': 'Greece', 'base_youth_unemployment': 35.2, 'gdp_growth': 1.5, 'econ_structure': 0.5, 'education': 0.6},
+    {'country': 'South Africa', 'base_youth_unemployment': 55.6, 'gdp_growth': 1.8, 'econ_structure': 0.4, 'education': 0.5},
+    {'country': 'Tunisia', 'base_youth_unemployment': 38.4, 'gdp_growth': 2.1, 'econ_structure': 0.4, 'education': 0.6},
+    {'country': 'Bosnia', 'base_youth_unemployment': 45.8, 'gdp_growth': 2.8, 'econ_structure': 0.3, 'education': 0.5},
+    {'country': 'North Macedonia', 'base_youth_unemployment': 35.7, 'gdp_growth': 3.2, 'econ_structure': 0.4, 'education': 0.6},
+    {'country': 'Turkey', 'base_youth_unemployment': 24.9, 'gdp_growth': 3.5, 'econ_structure': 0.6, 'education': 0.7},
+]
 
 # Global data loading
-def load_data():
+@trade_trace.traced("q456.load_data")
+def load_data(path=trade_cache.DATA_PATH):
     """Load and prepare the trade data"""
     print("Loading trade data...")
-    df = pd.read_csv("C:\\Users\\lokhe\\Downloads\\Datasets-20250819T145252Z-1-001\\Datasets\\processed_imports_full.csv")
+    df = trade_cache.load(DATA_COLUMNS, path)
     
     # Convert numeric columns
     df['import_value_numeric'] = pd.to_numeric(df.get('import_value'), errors='coerce')
@@ -14,55 +44,52 @@ def load_data():
     return df
 
 
-def analyze_agricultural_dependency():
-    """Question 1: Identify countries most dependent on agricultural imports from only 2–3 partners"""
-    print("="*80)
-    print("QUESTION 1: AGRICULTURAL IMPORT DEPENDENCY ANALYSIS")
-    print("="*80)
-    
-    df = load_data()
-    
-    # Identify agricultural commodities
-    agricultural_keywords = [
-        'food', 'grain', 'wheat', 'rice', 'corn', 'soy', 'meat', 'dairy', 
-        'fruit', 'vegetable', 'sugar', 'coffee', 'tea', 'fish', 'agricultural',
-        'livestock', 'poultry', 'beef', 'pork', 'milk', 'cheese', 'cereals'
-    ]
-    
-    # Filter for agricultural imports
-    ag_mask = df['cmdDesc'].str.lower().str.contains('|'.join(agricultural_keywords), na=False)
+def agricultural_dependency(df):
+    """Per-country partner concentration and ban disruption of agricultural imports
+
+    Every number is computed within one importing country, so row blocks
+    split on country boundaries give the same results as the whole frame.
+    Returns None when there are no agricultural imports.
+    """
+    # Identify agricultural commodities (HS chapters 01-24, keyword fallback)
+    ag_mask = commodity_classifier.sector_flags(df)['agricultural']
     ag_imports = df[ag_mask & (df['flowDesc'] == 'Import')].copy()
     
     if len(ag_imports) == 0:
-        print("No agricultural imports found in dataset with current keyword matching")
-        return
+        return None
     
-    # Calculate import dependency by country and partner
-    country_partner_ag = ag_imports.groupby(['Country', 'partnerDesc'])['import_value_numeric'].sum().reset_index()
-    country_total_ag = ag_imports.groupby('Country')['import_value_numeric'].sum().reset_index()
-    country_total_ag.columns = ['Country', 'total_ag_imports']
+    # Partner concentration per country: top-2/top-3 shares and top partners in one pass
+    concentration = trade_concentration.partner_concentration(
+        ag_imports, ['Country'], 'partnerDesc', 'import_value_numeric', k=3
+    )
     
-    # Merge to calculate dependency ratios
-    dependency_analysis = country_partner_ag.merge(country_total_ag, on='Country')
-    dependency_analysis['dependency_ratio'] = dependency_analysis['import_value_numeric'] / dependency_analysis['total_ag_imports']
+    # Country x partner agricultural import shares, built once for every scenario
+    shares, countries, partners = trade_bans.share_matrix(ag_imports, 'Country', 'partnerDesc', 'import_value_numeric')
+    disruption = trade_bans.simulate_bans(shares, trade_bans.ban_vectors(partners, BAN_SCENARIOS))
     
     # Find countries dependent on 2-3 partners for >50% of agricultural imports
-    high_dependency_countries = []
+    high_dependency = concentration[(concentration['top_2_share'] > 0.5) | (concentration['top_3_share'] > 0.6)]
+    return {'high_dependency': high_dependency, 'countries': countries, 'disruption': disruption}
+
+
+def report_agricultural_dependency(results):
+    """Print Question 1 from agricultural_dependency results"""
+    if results is None:
+        print("No agricultural imports found in dataset with current keyword matching")
+        return
     
-    for country in dependency_analysis['Country'].unique():
-        country_data = dependency_analysis[dependency_analysis['Country'] == country].sort_values('dependency_ratio', ascending=False)
-        
-        top_2_share = country_data.head(2)['dependency_ratio'].sum()
-        top_3_share = country_data.head(3)['dependency_ratio'].sum()
-        
-        if top_2_share > 0.5 or top_3_share > 0.6:
-            high_dependency_countries.append({
-                'country': country,
-                'top_2_share': top_2_share,
-                'top_3_share': top_3_share,
-                'total_ag_imports': country_data['total_ag_imports'].iloc[0],
-                'top_partners': list(country_data.head(3)['partnerDesc'].values)
-            })
+    high_dependency = results['high_dependency']
+    countries, disruption = results['countries'], results['disruption']
+    high_dependency_countries = [
+        {
+            'country': row['Country'],
+            'top_2_share': row['top_2_share'],
+            'top_3_share': row['top_3_share'],
+            'total_ag_imports': row['total'],
+            'top_partners': row['top_partners']
+        }
+        for row in high_dependency.to_dict('records')
+    ]
     
     print(f" ANSWER: Found {len(high_dependency_countries)} countries with high agricultural import dependency")
     print("\nCountries most dependent on 2-3 partners for agricultural imports:")
@@ -73,26 +100,15 @@ def analyze_agricultural_dependency():
         print(f"  Total ag imports: ${country_info['total_ag_imports']:,.0f}")
     
     # Food Security Risk Simulation
-    ban_scenarios = [
-        {'name': 'Major Grain Exporters Ban', 'banned_partners': ['United States', 'Russian Federation', 'Ukraine', 'Argentina']},
-        {'name': 'Regional Crisis', 'banned_partners': ['China', 'India', 'Brazil']},
-        {'name': 'Climate Emergency', 'banned_partners': ['Australia', 'Canada', 'United States']}
-    ]
-    
     print("\n FOOD SECURITY RISK SIMULATION:")
-    for scenario in ban_scenarios:
-        at_risk_countries = []
-        for country_info in high_dependency_countries:
-            impact_ratio = 0
-            for partner in scenario['banned_partners']:
-                if partner in country_info['top_partners']:
-                    impact_ratio += country_info['top_3_share'] / 3
-            
-            if impact_ratio > 0.2:  # >20% supply disruption
-                at_risk_countries.append({
-                    'country': country_info['country'],
-                    'disruption': min(impact_ratio, 1.0)
-                })
+    
+    at_risk_rows = np.isin(countries, [c['country'] for c in high_dependency_countries])
+    for scenario, scenario_disruption in zip(BAN_SCENARIOS, disruption):
+        at_risk_countries = [
+            {'country': country, 'disruption': value}
+            for country, value in zip(countries[at_risk_rows], scenario_disruption[at_risk_rows])
+            if value > 0.2  # >20% supply disruption
+        ]
         
         print(f"\n{scenario['name']}:")
         if at_risk_countries:
@@ -102,14 +118,25 @@ def analyze_agricultural_dependency():
         else:
             print("  No countries at significant risk from this scenario")
 
-def predict_youth_unemployment_2030():
-    """Question 2: Predict which countries will have youth unemployment >25% by 2030"""
+
+@trade_trace.traced("q456.agricultural_dependency")
+def analyze_agricultural_dependency():
+    """Question 1: Identify countries most dependent on agricultural imports from only 2–3 partners"""
     print("="*80)
-    print("QUESTION 2: YOUTH UNEMPLOYMENT PREDICTION FOR 2030")
+    print("QUESTION 1: AGRICULTURAL IMPORT DEPENDENCY ANALYSIS")
     print("="*80)
     
-    print("  NOTE: Trade data lacks demographic/employment data. Using framework with example data.")
-    
+    df = load_data()
+    report_agricultural_dependency(agricultural_dependency(df))
+
+def youth_projection(countries, mc_draws=None, offset=0):
+    """2030 youth unemployment under the global slowdown for `countries`
+
+    With mc_draws set, also runs the Monte Carlo over the model inputs.
+    `offset` is the position of countries[0] in the full list, so a country
+    keeps the same random stream however the list is split.
+    Returns (high-risk countries, Monte Carlo frame or None).
+    """
     def unemployment_model(base_rate, gdp_growth, economic_structure_score, education_score):
         """Simplified youth unemployment prediction model"""
         unemployment_change = (
@@ -119,22 +146,8 @@ def predict_youth_unemployment_2030():
         )
         return max(0, base_rate + unemployment_change)
     
-    # Example countries with current data (would need real data sources)
-    countries_data = [
-        {'country': 'Spain', 'base_youth_unemployment': 32.5, 'gdp_growth': 1.2, 'econ_structure': 0.7, 'education': 0.8},
-        {'country': 'Italy', 'base_youth_unemployment': 29.8, 'gdp_growth': 0.8, 'econ_structure': 0.6, 'education': 0.7},
-        {'country': 'Greece', 'base_youth_unemployment': 35.2, 'gdp_growth': 1.5, 'econ_structure': 0.5, 'education': 0.6},
-        {'country': 'South Africa', 'base_youth_unemployment': 55.6, 'gdp_growth': 1.8, 'econ_structure': 0.4, 'education': 0.5},
-        {'country': 'Tunisia', 'base_youth_unemployment': 38.4, 'gdp_growth': 2.1, 'econ_structure': 0.4, 'education': 0.6},
-        {'country': 'Bosnia', 'base_youth_unemployment': 45.8, 'gdp_growth': 2.8, 'econ_structure': 0.3, 'education': 0.5},
-        {'country': 'North Macedonia', 'base_youth_unemployment': 35.7, 'gdp_growth': 3.2, 'econ_structure': 0.4, 'education': 0.6},
-        {'country': 'Turkey', 'base_youth_unemployment': 24.9, 'gdp_growth': 3.5, 'econ_structure': 0.6, 'education': 0.7},
-    ]
-    
-    print("ANSWER: Countries predicted to have youth unemployment >25% by 2030 (Global Slowdown Scenario):")
-    
     high_risk_countries = []
-    for country_data in countries_data:
+    for country_data in countries:
         # Global slowdown reduces GDP growth by 2 percentage points
         predicted_rate = unemployment_model(
             country_data['base_youth_unemployment'],
@@ -150,45 +163,69 @@ def predict_youth_unemployment_2030():
                 'current_rate': country_data['base_youth_unemployment']
             })
     
+    mc = None
+    if mc_draws:
+        mc = youth_montecarlo.simulate(countries, draws=mc_draws, slowdown=-2.0, threshold=25, offset=offset)
+    return high_risk_countries, mc
+
+
+def report_youth_unemployment(high_risk_countries, mc=None, mc_draws=None):
+    """Print Question 2 from youth_projection results"""
+    print("ANSWER: Countries predicted to have youth unemployment >25% by 2030 (Global Slowdown Scenario):")
+    
     for country in sorted(high_risk_countries, key=lambda x: x['predicted_rate'], reverse=True):
         change = country['predicted_rate'] - country['current_rate']
         trend = "↗" if change > 0 else "↘"
         print(f"• {country['country']}: {country['predicted_rate']:.1f}% {trend} (current: {country['current_rate']:.1f}%)")
     
     print(f"\nSUMMARY: {len(high_risk_countries)} countries predicted to exceed 25% youth unemployment threshold")
+    
+    if mc is not None:
+        print(f"\nMONTE CARLO ({mc_draws:,} draws per country, Global Slowdown Scenario):")
+        for _, row in mc.sort_values('p_exceed', ascending=False, kind='stable').iterrows():
+            print(f"• {row['country']}: P(>25%) = {row['p_exceed']:.1%}  "
+                  f"median {row['p50']:.1f}% (P5 {row['p5']:.1f}% - P95 {row['p95']:.1f}%)")
 
-def analyze_export_aging_risk():
-    """Question 3: Export sectors most at risk from labor shortages due to aging demographics"""
+
+@trade_trace.traced("q456.youth_unemployment")
+def predict_youth_unemployment_2030(mc_draws=None):
+    """Question 2: Predict which countries will have youth unemployment >25% by 2030
+
+    With mc_draws set, also runs a Monte Carlo over the model inputs and
+    reports the probability of exceeding 25% with a P5-P95 band.
+    """
     print("="*80)
-    print("QUESTION 3: EXPORT SECTORS AT RISK FROM AGING DEMOGRAPHICS")
+    print("QUESTION 2: YOUTH UNEMPLOYMENT PREDICTION FOR 2030")
     print("="*80)
     
-    df = load_data()
+    print("  NOTE: Trade data lacks demographic/employment data. Using framework with example data.")
     
+    high_risk_countries, mc = youth_projection(YOUTH_COUNTRIES, mc_draws)
+    report_youth_unemployment(high_risk_countries, mc, mc_draws)
+
+
+def export_aging_exposure(df):
+    """Per-country labor-intensive export shares and sector export values
+
+    Like agricultural_dependency, everything is computed within one
+    exporting country. Returns None when there are no exports.
+    """
     # Analyze export patterns
     exports = df[df['flowDesc'] == 'Export'].copy()
     
     if len(exports) == 0:
-        print(" No export data found in dataset")
-        return
+        return None
     
     # Calculate export concentration by country and commodity
-    country_exports = exports.groupby(['Country', 'cmdDesc'])['import_value_numeric'].sum().reset_index()
-    country_total_exports = exports.groupby('Country')['import_value_numeric'].sum().reset_index()
+    country_exports = exports.groupby(['Country', 'cmdCode', 'cmdDesc'], observed=True)['import_value_numeric'].sum().reset_index()
+    country_total_exports = exports.groupby('Country', observed=True)['import_value_numeric'].sum().reset_index()
     country_total_exports.columns = ['Country', 'total_exports']
     
     export_analysis = country_exports.merge(country_total_exports, on='Country')
     export_analysis['export_share'] = export_analysis['import_value_numeric'] / export_analysis['total_exports']
     
-    # Identify labor-intensive sectors
-    labor_intensive_keywords = [
-        'textile', 'clothing', 'footwear', 'furniture', 'toy', 'leather',
-        'wood', 'paper', 'manufacturing', 'assembly', 'garment'
-    ]
-    
-    export_analysis['is_labor_intensive'] = export_analysis['cmdDesc'].str.lower().str.contains(
-        '|'.join(labor_intensive_keywords), na=False
-    )
+    # Identify labor-intensive sectors (textiles, leather, wood, paper, footwear, furniture/toys)
+    export_analysis['is_labor_intensive'] = commodity_classifier.sector_flags(export_analysis)['labor_intensive']
     
     # Calculate labor-intensive export dependency by country
     labor_exports = export_analysis[export_analysis['is_labor_intensive']].groupby('Country').agg({
@@ -198,6 +235,20 @@ def analyze_export_aging_risk():
     
     labor_exports.columns = ['Country', 'labor_intensive_share', 'labor_intensive_value']
     
+    # Country x HS chapter export values from the data
+    chapter_values, countries = aging_grid.export_chapter_matrix(export_analysis, 'Country', 'import_value_numeric')
+    return {'labor_exports': labor_exports, 'chapter_values': chapter_values, 'countries': countries}
+
+
+def report_export_aging_risk(results):
+    """Print Question 3 from export_aging_exposure results"""
+    if results is None:
+        print(" No export data found in dataset")
+        return
+    
+    labor_exports = results['labor_exports']
+    chapter_values, countries = results['chapter_values'], results['countries']
+    
     print(" ANSWER: Countries with highest labor-intensive export dependency:")
     
     top_labor_dependent = labor_exports[labor_exports['labor_intensive_share'] > 0.1].sort_values('labor_intensive_share', ascending=False)
@@ -206,39 +257,43 @@ def analyze_export_aging_risk():
         print(f"• {row['Country']}: {row['labor_intensive_share']:.1%} of exports are labor-intensive")
         print(f"  Value: ${row['labor_intensive_value']:,.0f}")
     
-    # Productivity impact simulation
-    def simulate_aging_impact(current_productivity, median_age_increase, sector_labor_intensity):
-        """Simulate productivity impact of aging workforce"""
-        age_productivity_decline = 0.02 * median_age_increase  # 2% decline per year
-        labor_adjustment_factor = sector_labor_intensity
-        
-        productivity_impact = current_productivity * (1 - age_productivity_decline * labor_adjustment_factor)
-        return max(0.5, productivity_impact)  # Floor at 50%
-    
     print("\n PRODUCTIVITY IMPACT SIMULATION:")
     
+    # Every age scenario evaluated against the country x HS chapter export values at once
     age_scenarios = [5, 10, 15]
-    example_sectors = [
-        {'sector': 'Manufacturing', 'current_prod': 100, 'labor_intensity': 0.8},
-        {'sector': 'Textiles', 'current_prod': 100, 'labor_intensity': 0.9},
-        {'sector': 'Agriculture', 'current_prod': 100, 'labor_intensity': 0.7},
-        {'sector': 'Construction', 'current_prod': 100, 'labor_intensity': 0.9},
-    ]
-    
-    for age_increase in age_scenarios:
+    at_risk, _ = aging_grid.value_at_risk(chapter_values, age_scenarios)
+    totals = chapter_values.sum(axis=1)[:, None]
+    country_at_risk = at_risk.sum(axis=1)
+    share_at_risk = np.divide(country_at_risk, totals, out=np.zeros_like(country_at_risk), where=totals != 0)
+    exported = aging_grid.sector_totals(chapter_values.sum(axis=0)) > 0
+    chapter_at_risk = at_risk.sum(axis=0)
+    
+    for a, age_increase in enumerate(age_scenarios):
         print(f"\nMedian age increase: +{age_increase} years")
-        for sector in example_sectors:
-            new_productivity = simulate_aging_impact(
-                sector['current_prod'], 
-                age_increase, 
-                sector['labor_intensity']
-            )
-            decline = (sector['current_prod'] - new_productivity) / sector['current_prod'] * 100
-            risk_level = " CRITICAL" if decline > 20 else "🟡 HIGH" if decline > 10 else "🟢 MODERATE"
-            print(f"  {sector['sector']}: {decline:.1f}% productivity decline {risk_level}")
+        for s, sector in enumerate(aging_grid.SECTORS):
+            if not exported[s]:
+                continue
+            sector_decline = aging_grid.productivity_decline(age_increase, aging_grid.SECTOR_LABOR_INTENSITY[sector]) * 100
+            risk_level = " CRITICAL" if sector_decline > 20 else "🟡 HIGH" if sector_decline > 10 else "🟢 MODERATE"
+            print(f"  {sector}: {sector_decline:.1f}% productivity decline {risk_level}")
+        top_chapters = [h for h in np.argsort(-chapter_at_risk[:, a], kind='stable')[:5] if chapter_at_risk[h, a] > 0]
+        print("  Top HS chapters at risk: " + ", ".join(
+            f"{aging_grid.CHAPTERS[h]} ({aging_grid.CHAPTER_SECTORS[h]}, ${chapter_at_risk[h, a]:,.0f})" for h in top_chapters))
+        for c in np.argsort(-share_at_risk[:, a], kind='stable')[:5]:
+            print(f"  • {countries[c]}: {share_at_risk[c, a]:.1%} of export value at risk (${at_risk[c, :, a].sum():,.0f})")
     
     print(f"\nSUMMARY: Labor-intensive export sectors face 10-30% productivity declines with demographic aging")
 
+@trade_trace.traced("q456.export_aging_risk")
+def analyze_export_aging_risk():
+    """Question 3: Export sectors most at risk from labor shortages due to aging demographics"""
+    print("="*80)
+    print("QUESTION 3: EXPORT SECTORS AT RISK FROM AGING DEMOGRAPHICS")
+    print("="*80)
+    
+    df = load_data()
+    report_export_aging_risk(export_aging_exposure(df))
+
 if __name__ == "__main__":
     print("Trade Analysis - Three Key Questions")
     print("Call individual functions:")
@@ -249,5 +304,5 @@ if __name__ == "__main__":
     
     # Uncomment to run all functions
     analyze_agricultural_dependency()
-    predict_youth_unemployment_2030()
+    predict_youth_unemployment_2030(mc_draws=1_000_000)
     analyze_export_aging_risk()
@@ -0,0 +1,123 @@
+import argparse
+import string
+
+import numpy as np
+import pandas as pd
+
+# Same 47 columns, in the same order, as processed_imports_full.csv
+COLUMNS = [
+    "typeCode", "freqCode", "refPeriodId", "Year", "refMonth", "period", "reporterCode",
+    "reporterISO", "Country", "flowCode", "flowDesc", "partnerCode", "partnerISO",
+    "partnerDesc", "partner2Code", "partner2ISO", "partner2Desc", "classificationCode",
+    "classificationSearchCode", "isOriginalClassification", "cmdCode", "cmdDesc", "aggrLevel",
+    "isLeaf", "customsCode", "customsDesc", "mosCode", "motCode", "motDesc", "qtyUnitCode",
+    "qtyUnitAbbr", "qty", "isQtyEstimated", "altQtyUnitCode", "altQtyUnitAbbr", "altQty",
+    "isAltQtyEstimated", "netWgt", "isNetWgtEstimated", "grossWgt", "isGrossWgtEstimated",
+    "import_value", "fobvalue", "primaryValue", "legacyEstimationFlag", "isReported",
+    "isAggregate",
+]
+
+CONSTANTS = {
+    "typeCode": "C", "freqCode": "A", "refMonth": 52, "partner2Code": 0, "partner2ISO": "W00",
+    "partner2Desc": "World", "classificationCode": "H6", "classificationSearchCode": "HS",
+    "isOriginalClassification": True, "aggrLevel": 6, "isLeaf": True, "customsCode": "C00",
+    "customsDesc": "TOTAL CPC", "mosCode": 0, "motCode": 0, "motDesc": "TOTAL MOT",
+    "qtyUnitCode": -1.0, "qtyUnitAbbr": np.nan, "qty": 0.0, "isQtyEstimated": 0,
+    "altQtyUnitCode": -1.0, "altQtyUnitAbbr": np.nan, "altQty": 0.0, "isAltQtyEstimated": 0.0,
+    "netWgt": 0.0, "isNetWgtEstimated": 0.0, "grossWgt": 0.0, "isGrossWgtEstimated": 0.0,
+    "fobvalue": 0.0, "legacyEstimationFlag": 0, "isReported": False, "isAggregate": 0.0,
+}
+
+# name: (reporters, partners, years, hs_codes, density)
+PRESETS = {
+    "tiny": (22, 25, 12, 1, 1.0),
+    "small": (50, 100, 10, 50, 0.4),
+    "medium": (100, 200, 15, 200, 0.25),
+    "large": (150, 220, 20, 400, 0.15),
+}
+
+HS_CHAPTERS = [c for c in range(1, 98) if c != 77]
+
+
+def iso_codes(n):
+    """n distinct three-letter codes: AAA, AAB, ..."""
+    letters = np.array(list(string.ascii_uppercase))
+    idx = np.arange(n)
+    return np.char.add(np.char.add(letters[idx // 676 % 26], letters[idx // 26 % 26]), letters[idx % 26])
+
+
+def generate(path, reporters=22, partners=25, years=12, hs_codes=1, density=1.0,
+             first_year=2000, export_share=0.0, seed=42):
+    """Write a synthetic Comtrade file; returns the number of rows written
+
+    Country sizes follow a Pareto law and each flow is
+    size(reporter) * size(partner) * weight(hs) * lognormal noise, so a few
+    countries and products dominate as in the real data. Rows are written
+    in bounded blocks, keeping memory flat for tens of millions of rows.
+    """
+    rng = np.random.default_rng(seed)
+    n_countries = max(reporters, partners)
+    isos = iso_codes(n_countries)
+    names = np.char.add("Country ", isos)
+    codes = np.arange(1, n_countries + 1) * 4
+    size = rng.pareto(1.2, n_countries) + 1
+
+    chapters = rng.choice(HS_CHAPTERS, hs_codes)
+    hs = np.char.add(np.char.zfill(chapters.astype(str), 2),
+                     np.char.zfill((np.arange(hs_codes) % 10000).astype(str), 4))
+    if hs_codes == 1:
+        hs, hs_desc = np.array(["TOTAL"]), np.array(["All Commodities"])
+    else:
+        hs_desc = np.char.add("HS chapter ", np.char.add(np.char.zfill(chapters.astype(str), 2), " product"))
+    hs_weight = rng.pareto(1.5, hs_codes) + 1
+
+    # Reporter blocks of at most ~2M candidate flows keep each chunk bounded
+    block = max(1, 2_000_000 // (partners * hs_codes))
+    written = 0
+    for y in range(years):
+        year = first_year + y
+        for r0 in range(0, reporters, block):
+            r, p, h = np.meshgrid(np.arange(r0, min(r0 + block, reporters)), np.arange(partners),
+                                  np.arange(hs_codes), indexing="ij")
+            r, p, h = r.ravel(), p.ravel(), h.ravel()
+            keep = (r != p) & (rng.random(r.size) < density)
+            r, p, h = r[keep], p[keep], h[keep]
+
+            value = 1e6 * size[r] * size[p] * hs_weight[h] * rng.lognormal(0.0, 1.0, r.size) * (1.03 ** y)
+            export = rng.random(r.size) < export_share
+            chunk = pd.DataFrame({
+                "refPeriodId": year * 10000 + 101, "Year": year, "period": year,
+                "reporterCode": codes[r], "reporterISO": isos[r], "Country": names[r],
+                "flowCode": np.where(export, "X", "M"), "flowDesc": np.where(export, "Export", "Import"),
+                "partnerCode": codes[p], "partnerISO": isos[p], "partnerDesc": names[p],
+                "cmdCode": hs[h], "cmdDesc": hs_desc[h],
+                "import_value": value / 1000, "primaryValue": value,
+                **CONSTANTS,
+            })[COLUMNS]
+            chunk.to_csv(path, mode="a" if written else "w", header=not written, index=False)
+            written += len(chunk)
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic Comtrade-schema CSV")
+    parser.add_argument("path")
+    parser.add_argument("--preset", choices=PRESETS, default="tiny")
+    parser.add_argument("--reporters", type=int)
+    parser.add_argument("--partners", type=int)
+    parser.add_argument("--years", type=int)
+    parser.add_argument("--hs-codes", type=int)
+    parser.add_argument("--density", type=float)
+    parser.add_argument("--export-share", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    reporters, partners, years, hs_codes, density = PRESETS[args.preset]
+    rows = generate(
+        args.path,
+        reporters=args.reporters or reporters, partners=args.partners or partners,
+        years=args.years or years, hs_codes=args.hs_codes or hs_codes,
+        density=args.density if args.density is not None else density,
+        export_share=args.export_share, seed=args.seed,
+    )
+    print(f"Wrote {rows:,} rows to {args.path}")
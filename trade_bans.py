@@ -0,0 +1,57 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+import trade_trace
+
+
+def share_matrix(df, country_col, partner_col, value_col):
+    """[country, partner] share of each country's imports coming from each partner
+
+    Returns (shares, countries, partners).
+    """
+    c_codes, countries = pd.factorize(df[country_col], sort=True)
+    p_codes, partners = pd.factorize(df[partner_col], sort=True)
+    keep = (c_codes >= 0) & (p_codes >= 0)
+
+    values = np.zeros((len(countries), len(partners)))
+    v = pd.to_numeric(df[value_col], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+    np.add.at(values, (c_codes[keep], p_codes[keep]), v[keep])
+
+    totals = values.sum(axis=1, keepdims=True)
+    shares = np.divide(values, totals, out=np.zeros_like(values), where=totals != 0)
+    return shares, np.asarray(countries), np.asarray(partners)
+
+
+def ban_vectors(partners, scenarios):
+    """[scenario, partner] indicator matrix from each scenario's 'banned_partners'"""
+    index = {p: n for n, p in enumerate(partners)}
+    bans = np.zeros((len(scenarios), len(partners)))
+    for n, scenario in enumerate(scenarios):
+        cols = [index[p] for p in scenario["banned_partners"] if p in index]
+        bans[n, cols] = 1.0
+    return bans
+
+
+def combination_bans(partners, candidates, r):
+    """Every r-of-N ban over `candidates` as (scenarios, indicator matrix)"""
+    index = {p: n for n, p in enumerate(partners)}
+    candidates = [p for p in candidates if p in index]
+    combos = np.array(list(combinations(range(len(candidates)), r)), dtype=np.intp).reshape(-1, r)
+
+    cols = np.array([index[p] for p in candidates], dtype=np.intp)
+    bans = np.zeros((len(combos), len(partners)))
+    np.put_along_axis(bans, cols[combos], 1.0, axis=1)
+    scenarios = [
+        {"name": " + ".join(candidates[i] for i in combo),
+         "banned_partners": [candidates[i] for i in combo]}
+        for combo in combos
+    ]
+    return scenarios, bans
+
+
+@trade_trace.traced("bans.simulate")
+def simulate_bans(shares, bans):
+    """[scenario, country] fraction of imports lost, for all scenarios in one product"""
+    return np.minimum(bans @ shares.T, 1.0)
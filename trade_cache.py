@@ -0,0 +1,153 @@
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import trade_trace
+
+DATA_PATH = "processed_imports_full.csv"
+CACHE_DIR = ".trade_cache"
+CACHE_VERSION = 2
+
+YEAR_COLS = ("Year", "refYear")
+# Codes that must stay text: HS codes keep their leading zeros (0101 is chapter 01)
+TEXT_COLS = ("cmdCode", "reporterISO", "partnerISO", "partner2ISO")
+
+
+# ====== Cache location ======
+def _cache_key(path):
+    """Cache directory name for the current version of the source file"""
+    st = os.stat(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return stem, f"{stem}-v{CACHE_VERSION}-{st.st_size}-{st.st_mtime_ns}"
+
+
+def _cache_root(path):
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+
+
+# ====== Build ======
+def _encode_column(s, name):
+    """Turn one parsed CSV column into (array, meta) for the cache"""
+    if name in YEAR_COLS:
+        s = pd.to_numeric(s, errors="coerce")
+        if s.notna().all():
+            return s.to_numpy(dtype=np.int16), {"kind": "values"}
+        return s.to_numpy(dtype=np.float64), {"kind": "values"}
+
+    if pd.api.types.is_bool_dtype(s):
+        return s.to_numpy(dtype=bool), {"kind": "values"}
+    if pd.api.types.is_integer_dtype(s):
+        return s.to_numpy(dtype=np.int64), {"kind": "values"}
+    if pd.api.types.is_float_dtype(s):
+        return s.to_numpy(dtype=np.float64), {"kind": "values"}
+
+    # ISO codes, descriptions and flags -> categorical codes + category list
+    cat = s.astype(str).where(s.notna()).astype("category")
+    codes = cat.cat.codes.to_numpy()
+    return codes, {"kind": "category", "categories": [str(c) for c in cat.cat.categories]}
+
+
+def _stale_entries(root, stem, key, source):
+    """Published caches of `source` other than `key`
+
+    Matches the exact key format and the recorded source, so caches of other
+    files whose names start with the same stem are left alone.
+    """
+    pattern = re.compile(re.escape(stem) + r"-v\d+-\d+-\d+")
+    for entry in os.listdir(root):
+        if entry == key or not pattern.fullmatch(entry):
+            continue
+        try:
+            with open(os.path.join(root, entry, "meta.json")) as f:
+                if json.load(f).get("source") != source:
+                    continue
+        except (OSError, ValueError):
+            continue
+        yield os.path.join(root, entry)
+
+
+@trade_trace.traced("cache.build")
+def build_cache(path=DATA_PATH):
+    """Parse the CSV once and write one .npy file per column
+
+    Safe to run from several processes at once: each builds in its own
+    temporary directory and the first to publish wins.
+    """
+    stem, key = _cache_key(path)
+    root = _cache_root(path)
+    target = os.path.join(root, key)
+    source = os.path.abspath(path)
+
+    # stderr keeps stdout clean for tools that stream results (trade_server --batch)
+    print(f"Building columnar cache for {path}...", file=sys.stderr)
+    header = pd.read_csv(path, nrows=0).columns
+    df = pd.read_csv(path, low_memory=False, dtype={c: str for c in TEXT_COLS if c in header})
+
+    os.makedirs(root, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=key + ".", suffix=".tmp", dir=root)
+    try:
+        meta = {"source": source, "rows": int(len(df)), "columns": {}}
+        for i, name in enumerate(df.columns):
+            arr, col_meta = _encode_column(df[name], name)
+            col_meta["file"] = f"{i}.npy"
+            np.save(os.path.join(tmp, col_meta["file"]), arr)
+            meta["columns"][name] = col_meta
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, target)
+    except OSError:
+        # Another process published the same key first; use theirs
+        if not os.path.exists(os.path.join(target, "meta.json")):
+            raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    # Drop caches for older versions of the same file
+    for entry in _stale_entries(root, stem, key, source):
+        shutil.rmtree(entry, ignore_errors=True)
+    return target
+
+
+def ensure_cache(path=DATA_PATH):
+    """Return (cache_dir, meta), rebuilding if the CSV size or mtime changed"""
+    _, key = _cache_key(path)
+    target = os.path.join(_cache_root(path), key)
+    if not os.path.exists(os.path.join(target, "meta.json")):
+        build_cache(path)
+    with open(os.path.join(target, "meta.json")) as f:
+        return target, json.load(f)
+
+
+# ====== Read ======
+def cached_columns(path=DATA_PATH):
+    """Column names of the source file, in CSV order"""
+    _, meta = ensure_cache(path)
+    return list(meta["columns"])
+
+
+@trade_trace.traced("cache.load")
+def load(columns=None, path=DATA_PATH):
+    """Load the requested columns from the memory-mapped cache"""
+    target, meta = ensure_cache(path)
+    if columns is None:
+        columns = list(meta["columns"])
+
+    missing = [c for c in columns if c not in meta["columns"]]
+    if missing:
+        raise KeyError(f"Columns not in {path}: {missing}")
+
+    data = {}
+    for name in columns:
+        col_meta = meta["columns"][name]
+        arr = np.load(os.path.join(target, col_meta["file"]), mmap_mode="r")
+        if col_meta["kind"] == "category":
+            data[name] = pd.Categorical.from_codes(arr, categories=col_meta["categories"])
+        else:
+            data[name] = arr
+    return pd.DataFrame(data, copy=False)
@@ -0,0 +1,44 @@
+import trade_trace
+
+
+@trade_trace.traced("concentration")
+def partner_concentration(df, group_cols, partner_col, value_col, k=3):
+    """Top-k partner shares, top partners and HHI for every group in one pass
+
+    `group_cols` is e.g. ['Country'] or ['Country', 'Year', 'hs_chapter'].
+    Rows are summed per (group, partner), ranked inside each group with one
+    sort, and the top k ranks are pivoted into columns, so there is no
+    per-group filtering.
+
+    Returns one row per group with:
+      total, n_partners, hhi
+      top_1_share .. top_k_share   cumulative share of the n largest partners
+      top_partners                 list of the k largest partners, largest first
+    """
+    group_cols = list(group_cols)
+    pairs = df.groupby(group_cols + [partner_col], observed=True, as_index=False)[value_col].sum()
+    pairs["total"] = pairs.groupby(group_cols, observed=True)[value_col].transform("sum")
+    pairs["share"] = pairs[value_col] / pairs["total"]
+    pairs["share_sq"] = pairs["share"] ** 2
+
+    pairs = pairs.sort_values(
+        group_cols + ["share"], ascending=[True] * len(group_cols) + [False], kind="stable"
+    )
+    pairs["rank"] = pairs.groupby(group_cols, observed=True).cumcount()
+
+    out = pairs.groupby(group_cols, observed=True).agg(
+        total=("total", "first"),
+        n_partners=(partner_col, "size"),
+        hhi=("share_sq", "sum"),
+    )
+
+    # Only the first k ranks of each group survive the partial selection
+    top = pairs[pairs["rank"] < k]
+    shares = top.set_index(group_cols + ["rank"])["share"].unstack("rank")
+    shares = shares.reindex(columns=range(k)).fillna(0).cumsum(axis=1)
+    for n in range(k):
+        out[f"top_{n + 1}_share"] = shares[n]
+    partners = top[partner_col].astype(object)
+    out["top_partners"] = partners.groupby([top[c] for c in group_cols], observed=True).agg(list)
+
+    return out.reset_index()
@@ -0,0 +1,71 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+import trade_trace
+
+
+# ====== Build ======
+@trade_trace.traced("graph.adjacency")
+def adjacency(agg, year, isos=None):
+    """Sparse [exporter, importer] export matrix for one year
+
+    `isos` restricts (and orders) the countries; by default every country
+    trading in that year is included, in sorted order. Returns (A, isos).
+    """
+    flows = agg[agg["Year"] == year]
+    exporters = flows["ExporterISO"].astype(str)
+    importers = flows["ImporterISO"].astype(str)
+    if isos is None:
+        isos = np.union1d(exporters.unique(), importers.unique())
+    isos = np.asarray(isos)
+
+    e = pd.Categorical(exporters, categories=isos).codes
+    i = pd.Categorical(importers, categories=isos).codes
+    keep = (e >= 0) & (i >= 0)
+    A = sparse.csr_matrix(
+        (flows["Exports"].to_numpy(dtype=np.float64)[keep], (e[keep], i[keep])),
+        shape=(len(isos), len(isos)),
+    )
+    return A, isos
+
+
+def subset(A, isos, keep):
+    """Restrict an adjacency matrix to the countries in `keep`, preserving order"""
+    idx = np.flatnonzero(np.isin(isos, list(keep)))
+    return A[idx][:, idx], isos[idx]
+
+
+# ====== Degree and totals ======
+def positive_edges(A):
+    """Drop zero and negative flows, which are not trade links"""
+    A = A.multiply(A > 0).tocsr()
+    A.eliminate_zeros()
+    return A
+
+
+def weighted_degree(A):
+    """(out, in, total) weighted degree per node, as G.degree(weight=...) would give"""
+    out_deg = np.asarray(A.sum(axis=1)).ravel()
+    in_deg = np.asarray(A.sum(axis=0)).ravel()
+    return out_deg, in_deg, out_deg + in_deg
+
+
+def trade_totals(A, isos):
+    """ISO, ExportsTotal, ImportsTotal, TotalTrade per country"""
+    out_deg, in_deg, total = weighted_degree(A)
+    return pd.DataFrame({
+        "ISO": isos, "ExportsTotal": out_deg, "ImportsTotal": in_deg, "TotalTrade": total,
+    })
+
+
+# ====== networkx view ======
+def to_networkx(A, isos):
+    """DiGraph with ISO node labels and a 'weight' per positive flow"""
+    A = positive_edges(A).tocoo()
+    labels = np.asarray(isos).astype(object)
+    G = nx.DiGraph()
+    G.add_nodes_from(labels)
+    G.add_weighted_edges_from(zip(labels[A.row], labels[A.col], A.data.tolist()))
+    return G
@@ -0,0 +1,168 @@
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import networkx as nx
+
+import trade_graph
+import trade_stream
+import trade_trace
+from trade_cache import CACHE_DIR
+
+LAYOUT_DIR = os.path.join(CACHE_DIR, "layouts")
+NON_INTERACTIVE = {"agg", "svg", "pdf", "ps", "cairo", "pgf", "template"}
+
+
+def headless():
+    """True when the active matplotlib backend cannot open a window"""
+    return matplotlib.get_backend().lower() in NON_INTERACTIVE
+
+
+# ====== Layouts ======
+def cached_layout(G, seed=42, k=0.5, cache_dir=LAYOUT_DIR):
+    """spring_layout positions, stored on disk per node set so repeat renders skip the solve"""
+    key = json.dumps([sorted(map(str, G.nodes())), seed, k])
+    path = os.path.join(cache_dir, hashlib.sha1(key.encode()).hexdigest() + ".json")
+    if os.path.exists(path):
+        with open(path) as f:
+            return {n: tuple(xy) for n, xy in json.load(f).items()}
+
+    with trade_trace.stage("render.spring_layout", rows_in=G.number_of_nodes()):
+        pos = nx.spring_layout(G, seed=seed, k=k)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({str(n): [float(x), float(y)] for n, (x, y) in pos.items()}, f)
+    os.replace(tmp, path)
+    return pos
+
+
+# ====== Networks and figures ======
+def top_network(agg, year, top=25):
+    """Top-`top` traders of `year` as a DiGraph, with trade totals and betweenness"""
+    A, isos = trade_graph.adjacency(agg, year)
+    trade_sum = trade_graph.trade_totals(A, isos)
+    keep = set(trade_sum.sort_values("TotalTrade", ascending=False).head(top)["ISO"])
+    G = trade_graph.to_networkx(*trade_graph.subset(A, isos, keep))
+    bet = nx.betweenness_centrality(G, weight="weight", normalized=True)
+    return G, trade_sum, bet
+
+
+def draw_knockout(G, removed, pos, bet, trade_sum, year, n_labels=10):
+    """Before/after figure for removing `removed` from G, on shared positions"""
+    import matplotlib.pyplot as plt
+
+    G_removed = G.copy()
+    G_removed.remove_node(removed)
+    total = trade_sum.set_index("ISO")["TotalTrade"]
+    ranked = sorted(G.nodes(), key=lambda n: bet.get(n, 0), reverse=True)[:n_labels]
+
+    # Node size by trade, color by centrality
+    sizes = {n: total[n] / 1e9 if n in total.index else 200 for n in G.nodes()}
+    colors = {n: bet.get(n, 0) for n in G.nodes()}
+
+    fig = plt.figure(figsize=(18, 9))
+    panels = [
+        (G, ranked, f"Trade Network (Top {G.number_of_nodes()}) - {year}\nBefore Removal"),
+        (G_removed, [n for n in ranked if n != removed], f"After Removing {removed}"),
+    ]
+    for i, (H, label_nodes, title) in enumerate(panels):
+        ax = fig.add_subplot(1, 2, i + 1)
+        nx.draw_networkx_edges(H, pos, ax=ax, alpha=0.2, arrowsize=6, width=0.5)
+        nodes = nx.draw_networkx_nodes(
+            H, pos, ax=ax, node_size=[sizes[n] for n in H.nodes()],
+            node_color=[colors[n] for n in H.nodes()], cmap="viridis",
+        )
+        nx.draw_networkx_labels(H, pos, ax=ax, labels={n: n for n in label_nodes},
+                                font_size=9, font_weight="bold")
+        ax.set_title(title, fontsize=14, fontweight="bold")
+        fig.colorbar(nodes, ax=ax, shrink=0.7, label="Betweenness Centrality")
+    fig.tight_layout()
+    return fig
+
+
+# ====== Batch rendering ======
+_NETWORKS = None
+
+
+def _init_worker(networks):
+    global _NETWORKS
+    matplotlib.use("Agg")
+    _NETWORKS = networks
+
+
+@trade_trace.worker_task
+def _render(job):
+    """Render one (year, removed, path, top) job; removed=None means the most central node"""
+    import matplotlib.pyplot as plt
+
+    year, removed, path, top = job
+    G, trade_sum, bet = _NETWORKS[year]
+    if removed is None:
+        removed = max(G.nodes(), key=lambda n: bet.get(n, 0))
+    if removed not in G:
+        return path, f"{removed} not in the top {top} for {year}"
+    fig = draw_knockout(G, removed, cached_layout(G), bet, trade_sum, year)
+    fig.savefig(path, dpi=100)
+    plt.close(fig)
+    return path, None
+
+
+def top_networks(agg, years, top=25):
+    """top_network for each year, keyed by year"""
+    return {int(year): top_network(agg, int(year), top) for year in years}
+
+
+def render_batch(agg, jobs, out_dir, fmt="png", top=25, processes=None, networks=None):
+    """Write one figure per (year, removed) job across worker processes
+
+    Each year's network and betweenness are computed once, here or by the
+    caller through `networks` (a top_networks result), and shipped once to
+    each worker; layouts are shared between workers through the on-disk cache.
+
+    Returns (written paths, skipped [(path, reason)]).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    networks = dict(networks or {})
+    networks.update(top_networks(agg, {int(y) for y, _ in jobs} - set(networks), top))
+    tasks = [
+        (int(year), removed, os.path.join(out_dir, f"network-{year}-{removed or 'central'}.{fmt}"), top)
+        for year, removed in jobs
+    ]
+    written, skipped = [], []
+    with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(networks,)) as pool:
+        for path, reason in pool.map(_render, tasks):
+            if reason:
+                skipped.append((path, reason))
+            else:
+                written.append(path)
+    return written, skipped
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render trade-network knockout figures headlessly")
+    parser.add_argument("--year", type=int, action="append", help="year(s) to render (default: all)")
+    parser.add_argument("--remove", action="append", help="country to remove (default: the most central)")
+    parser.add_argument("--all-removals", action="store_true", help="one figure per country in the network")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--format", choices=["png", "svg"], default="png")
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--out", default="figures")
+    args = parser.parse_args()
+
+    matplotlib.use("Agg")
+    agg = trade_stream.load_exports()
+    years = args.year or sorted(int(y) for y in agg["Year"].unique())
+    networks = top_networks(agg, years, args.top)
+    jobs = []
+    for year in years:
+        removals = sorted(networks[year][0].nodes()) if args.all_removals else args.remove or [None]
+        jobs += [(year, r) for r in removals]
+
+    written, skipped = render_batch(agg, jobs, args.out, args.format, args.top, args.processes, networks)
+    print(f"Wrote {len(written)} figure(s) to {args.out}")
+    for path, reason in skipped:
+        print(f"  skipped {path}: {reason}")
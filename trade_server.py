@@ -0,0 +1,279 @@
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+import trade_bans
+import trade_graph
+import trade_resilience
+import trade_shocks
+import trade_stream
+import trade_tensor
+
+
+# ====== Bounded LRU result cache ======
+class ResultCache:
+    """LRU cache of JSON-encoded results, bounded by total encoded size"""
+
+    def __init__(self, max_bytes=64 * 2**20):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, payload):
+        with self._lock:
+            if key in self._items or len(payload) > self.max_bytes:
+                return
+            self._items[key] = payload
+            self.bytes += len(payload)
+            while self.bytes > self.max_bytes:
+                _, old = self._items.popitem(last=False)
+                self.bytes -= len(old)
+
+    def stats(self):
+        return {"entries": len(self._items), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+
+# ====== Resident data ======
+class TradeState:
+    """Pair sums and every matrix derived from them, built once for the life of the server"""
+
+    def __init__(self, **load_args):
+        start = time.perf_counter()
+        self.agg = trade_stream.load_exports(**load_args)
+        self.tensor = trade_tensor.build_tensor(self.agg)
+        self.import_shares = np.nan_to_num(trade_tensor.import_shares(self.tensor))
+        self.top_partner = trade_tensor.top_partner(self.tensor)
+        self.propagation = trade_shocks.propagation_network(self.agg)
+        self.latest = int(self.tensor.years.max())
+        self.load_seconds = time.perf_counter() - start
+        self._networks = {}
+        self._baselines = {}
+
+    def year(self, params):
+        return int(params.get("year") or self.latest)
+
+    def network(self, year, top):
+        """Top-`top` trade network of `year` as a DiGraph, built once per (year, top)"""
+        if (year, top) not in self._networks:
+            A, isos = trade_graph.adjacency(self.agg, year)
+            totals = trade_graph.trade_totals(A, isos)
+            keep = set(totals.sort_values("TotalTrade", ascending=False).head(top)["ISO"])
+            self._networks[year, top] = trade_graph.to_networkx(*trade_graph.subset(A, isos, keep))
+        return self._networks[year, top]
+
+    def baseline(self, year, top, pivots):
+        """(pivot sources, scale, betweenness counts) of the top-`top` network, once per (year, top, pivots)"""
+        key = (year, top, pivots)
+        if key not in self._baselines:
+            G = self.network(year, top)
+            sources = trade_resilience.pivot_sources(G, pivots)
+            counts = trade_resilience.knockout_betweenness(G, (), sources)
+            self._baselines[key] = (sources, trade_resilience.knockout_scale(G, sources), counts)
+        return self._baselines[key]
+
+
+def _isos(value, known=None):
+    """ISO codes from a list or comma-separated string; with `known`, every code must be in it"""
+    if isinstance(value, str):
+        codes = [v for v in value.split(",") if v]
+    elif isinstance(value, list) and all(isinstance(v, str) for v in value):
+        codes = value
+    else:
+        raise ValueError(f"expected ISO codes as a list or comma-separated string, got {value!r}")
+    if known is not None:
+        unknown = sorted(set(codes) - set(known))
+        if unknown:
+            raise KeyError(f"unknown ISO code(s): {', '.join(unknown)}")
+    return codes
+
+
+def _top(isos, values, n, name):
+    order = np.argsort(-np.nan_to_num(values, nan=-np.inf), kind="stable")[:n]
+    return [{"ISO": str(isos[i]), name: float(values[i])} for i in order]
+
+
+# ====== Queries ======
+def query_exposure(state, p):
+    """Importers hit hardest when `exporter` cuts exports by `magnitude`"""
+    year = state.year(p)
+    scenario = (_isos(p["exporter"], state.tensor.isos), float(p.get("magnitude", 0.25)), year)
+    pct_imports, pct_exports = trade_shocks.evaluate(state.tensor, [scenario])
+    n = int(p.get("top", 10))
+    return {"year": year, "ShockPct_of_Imports": _top(state.tensor.isos, pct_imports[0], n, "pct"),
+            "Shock_asPct_of_TotalExports": _top(state.tensor.isos, pct_exports[0], n, "pct")}
+
+
+def query_tdi(state, p):
+    """Trade Dependency Index per exporter, optionally with a top-partner collapse"""
+    year = state.year(p)
+    tdi = trade_tensor.tdi_frame(state.tensor, year, state.top_partner)
+    tdi["Shock_asPct_of_TotalExports"] = 100 * float(p.get("magnitude", 0.40)) * tdi["TDI"]
+    tdi = tdi.sort_values("TDI", ascending=False).head(int(p.get("top", 10)))
+    return {"year": year, "rows": json.loads(tdi.to_json(orient="records"))}
+
+
+def query_ban(state, p):
+    """Share of each importer's imports lost if `banned` exporters stop shipping"""
+    year = state.year(p)
+    shares = state.import_shares[trade_tensor.year_pos(state.tensor, year)].T
+    bans = trade_bans.ban_vectors(state.tensor.isos, [{"banned_partners": _isos(p["banned"], state.tensor.isos)}])
+    disruption = trade_bans.simulate_bans(shares, bans)[0]
+    return {"year": year, "disruption": _top(state.tensor.isos, disruption, int(p.get("top", 10)), "share")}
+
+
+def query_knockout(state, p):
+    """Betweenness change of every node when `remove` leaves the top-N network
+
+    Uses the resident baseline and its pivot set, as resilience_sweep does.
+    """
+    year = state.year(p)
+    top = int(p.get("network", 25))
+    G = state.network(year, top)
+    removed = _isos(p["remove"], G.nodes())
+    pivots = int(p["pivots"]) if p.get("pivots") else None
+    sources, scale, before = state.baseline(year, top, pivots)
+    after = trade_resilience.knockout_betweenness(G, removed, sources)
+    nodes = sorted(after)
+    delta = scale * np.array([after[n] - before[n] for n in nodes])
+    return {"year": year, "delta": _top(np.array(nodes), np.abs(delta), int(p.get("top", 10)), "abs_delta")}
+
+
+def query_propagate(state, p):
+    """Multi-round propagation of an export cut"""
+    year = state.year(p)
+    result = trade_shocks.propagate(state.agg, _isos(p["shocked"], state.tensor.isos), float(p.get("magnitude", 0.25)),
+                                    year=year, passthrough=float(p.get("passthrough", 0.5)),
+                                    network=state.propagation)
+    result = result[result["Year"] == year].sort_values("CumulativeLossPct", ascending=False)
+    return {"year": year, "rows": json.loads(result.head(int(p.get("top", 10))).to_json(orient="records"))}
+
+
+QUERIES = {
+    "exposure": query_exposure,
+    "tdi": query_tdi,
+    "ban": query_ban,
+    "knockout": query_knockout,
+    "propagate": query_propagate,
+}
+
+
+def _error(message, **extra):
+    return json.dumps({"error": message, **extra}), False
+
+
+def answer(state, cache, params):
+    """(JSON-encoded answer, ok) for one query dict, served from the cache when possible
+
+    Bad input never raises: it comes back as an error payload with ok=False.
+    """
+    if not isinstance(params, dict):
+        return _error(f"expected a JSON object, got {type(params).__name__}")
+    params = {k: v for k, v in params.items() if k != "id"}
+    kind = params.get("query")
+    if kind not in QUERIES:
+        return _error(f"unknown query {kind!r}", queries=sorted(QUERIES))
+    key = json.dumps(params, sort_keys=True)
+    payload = cache.get(key)
+    if payload is None:
+        try:
+            payload = json.dumps(QUERIES[kind](state, params))
+        except Exception as e:
+            return _error(f"{type(e).__name__}: {e}")
+        cache.put(key, payload)
+    return payload, True
+
+
+# ====== HTTP mode ======
+def make_handler(state, cache):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, payload, status=200):
+            body = payload.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/stats":
+                return self._send(json.dumps({"cache": cache.stats(), "load_seconds": state.load_seconds}))
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            params.setdefault("query", url.path.strip("/"))
+            payload, ok = answer(state, cache, params)
+            self._send(payload, 200 if ok else 400)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                params = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError as e:
+                return self._send(json.dumps({"error": str(e)}), status=400)
+            payload, ok = answer(state, cache, params)
+            self._send(payload, 200 if ok else 400)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+# ====== JSONL batch mode ======
+def run_batch(state, cache, lines, out):
+    """Answer one JSON query per input line, writing one JSON line per answer"""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            params = json.loads(line)
+        except json.JSONDecodeError as e:
+            out.write(json.dumps({"id": None, "result": {"error": str(e)}}) + "\n")
+            continue
+        payload, _ = answer(state, cache, params)
+        query_id = params.get("id") if isinstance(params, dict) else None
+        out.write(f'{{"id": {json.dumps(query_id)}, "result": {payload}}}\n')
+        out.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resident trade query server (HTTP or JSONL batch)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--batch", help="JSONL file of queries ('-' for stdin); answers go to stdout")
+    parser.add_argument("--cache-mb", type=float, default=64)
+    args = parser.parse_args()
+
+    state = TradeState()
+    cache = ResultCache(int(args.cache_mb * 2**20))
+    print(f"Loaded {len(state.agg):,} pair sums in {state.load_seconds:.2f}s", file=sys.stderr)
+
+    if args.batch:
+        with (sys.stdin if args.batch == "-" else open(args.batch)) as lines:
+            run_batch(state, cache, lines, sys.stdout)
+    else:
+        server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(state, cache))
+        print(f"Serving on http://127.0.0.1:{args.port}/<query>?... ({', '.join(QUERIES)})", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+import trade_tensor
+import trade_trace
+
+
+# ====== Scenario encoding ======
+def scenario_matrix(tensor, scenarios):
+    """Encode (exporters, magnitude, year) triples as a [scenario, exporter] cut matrix
+
+    `exporters` may be one ISO code or a list of them. Returns the cut
+    fractions and the year position of every scenario.
+    """
+    index = trade_tensor.iso_index(tensor)
+    cuts = np.zeros((len(scenarios), len(tensor.isos)))
+    years = np.empty(len(scenarios), dtype=np.intp)
+    for n, (exporters, magnitude, year) in enumerate(scenarios):
+        if isinstance(exporters, str):
+            exporters = [exporters]
+        cuts[n, [index[e] for e in exporters]] = magnitude
+        years[n] = trade_tensor.year_pos(tensor, year)
+    return cuts, years
+
+
+def sweep_scenarios(tensor, magnitudes, years=None, exporters=None):
+    """Every exporter (or the given ones) at every magnitude, for every year"""
+    if years is None:
+        years = tensor.years
+    if exporters is None:
+        exporters = tensor.isos
+    return [(e, m, y) for y in years for e in exporters for m in magnitudes]
+
+
+# ====== Batch evaluation ======
+@trade_trace.traced("shocks.evaluate")
+def evaluate(tensor, scenarios):
+    """First-order impact of many shocks at once
+
+    A scenario cuts the shocked countries' trade by `magnitude`: their
+    exports fall (question-2.py's China drop) and their demand for imports
+    falls (question-1.py's top-partner collapse). Returns two
+    [scenario, country] arrays:
+      ShockPct_of_Imports          imports lost from shocked exporters, % of total imports
+      Shock_asPct_of_TotalExports  exports lost to shocked importers, % of total exports
+    """
+    cuts, years = scenario_matrix(tensor, scenarios)
+    imp_tot = trade_tensor.import_totals(tensor)
+    exp_tot = trade_tensor.export_totals(tensor)
+
+    pct_imports = np.zeros_like(cuts)
+    pct_exports = np.zeros_like(cuts)
+    # Two matrix products per distinct year cover all of that year's scenarios
+    for y in np.unique(years):
+        rows = years == y
+        lost_imports = cuts[rows] @ tensor.values[y]
+        lost_exports = cuts[rows] @ tensor.values[y].T
+        pct_imports[rows] = 100 * trade_tensor.safe_divide(lost_imports, np.broadcast_to(imp_tot[y], lost_imports.shape))
+        pct_exports[rows] = 100 * trade_tensor.safe_divide(lost_exports, np.broadcast_to(exp_tot[y], lost_exports.shape))
+    return pct_imports, pct_exports
+
+
+def impact_frame(tensor, scenarios, metric="ShockPct_of_Imports"):
+    """Scenarios x countries DataFrame for one of the two impact metrics"""
+    pct_imports, pct_exports = evaluate(tensor, scenarios)
+    values = pct_imports if metric == "ShockPct_of_Imports" else pct_exports
+    index = pd.MultiIndex.from_tuples(
+        [("+".join([e] if isinstance(e, str) else e), m, y) for e, m, y in scenarios],
+        names=["Exporters", "Magnitude", "Year"],
+    )
+    return pd.DataFrame(values, index=index, columns=tensor.isos)
+
+
+# ====== Multi-round propagation ======
+def share_network(agg):
+    """Sparse bilateral network over (year, country) nodes, straight from the pair sums
+
+    Returns (flows, nodes): flows[exporter_node, importer_node] is the trade
+    value and nodes is a Year/ISO frame describing each row/column. Years
+    never mix, so the matrix is block-diagonal by year.
+    """
+    years = np.sort(agg["Year"].unique())
+    isos = np.union1d(agg["ExporterISO"].astype(str).unique(),
+                      agg["ImporterISO"].astype(str).unique())
+    n = len(isos)
+    y = np.searchsorted(years, agg["Year"].to_numpy())
+    e = pd.Categorical(agg["ExporterISO"].astype(str), categories=isos).codes
+    i = pd.Categorical(agg["ImporterISO"].astype(str), categories=isos).codes
+
+    size = len(years) * n
+    flows = sparse.csr_matrix(
+        (agg["Exports"].to_numpy(dtype=np.float64), (y * n + e, y * n + i)), shape=(size, size)
+    )
+    nodes = pd.DataFrame({"Year": np.repeat(years, n), "ISO": np.tile(isos, len(years))})
+    return flows, nodes
+
+
+def propagation_network(agg):
+    """(shares_t, exp_tot, nodes) for propagate; build once to run many shocks
+
+    shares_t[i, e] is the fraction of importer node i's imports coming from
+    exporter node e, and exp_tot the total exports of every node.
+    """
+    flows, nodes = share_network(agg)
+    exp_tot = np.asarray(flows.sum(axis=1)).ravel()
+    imp_tot = np.asarray(flows.sum(axis=0)).ravel()
+
+    inv = np.divide(1.0, imp_tot, out=np.zeros_like(imp_tot), where=imp_tot != 0)
+    shares_t = (flows @ sparse.diags(inv)).T.tocsr()
+    return shares_t, exp_tot, nodes
+
+
+@trade_trace.traced("shocks.propagate")
+def propagate(agg, shocked, magnitude, year=None, passthrough=0.5, max_depth=50, tol=1e-6, network=None):
+    """Push an export cut through the trade network round by round
+
+    Round 0 cuts the shocked countries' exports by `magnitude`. In every
+    later round each importer loses the share of its imports that came from
+    cut exporters and cuts its own exports by `passthrough` times that share.
+    Stops when no cut exceeds `tol` or after `max_depth` rounds. Pass a
+    propagation_network(agg) result as `network` to skip rebuilding it.
+
+    Returns one row per (Year, ISO) with the cumulative export loss (value
+    and % of total exports) and the first round the country was affected.
+    """
+    if isinstance(shocked, str):
+        shocked = [shocked]
+    shares_t, exp_tot, nodes = network if network is not None else propagation_network(agg)
+
+    start = nodes["ISO"].isin(shocked).to_numpy(copy=True)
+    if year is not None:
+        start &= (nodes["Year"] == year).to_numpy()
+    cut = np.where(start, float(magnitude), 0.0)
+
+    cum_cut = np.zeros_like(cut)
+    first_round = np.full(len(cut), -1)
+    for depth in range(max_depth + 1):
+        hit = (cut > tol) & (first_round < 0)
+        first_round[hit] = depth
+        cut = np.minimum(cut, 1.0 - cum_cut)
+        cum_cut += cut
+        if not (cut > tol).any():
+            break
+        cut = passthrough * (shares_t @ cut)
+
+    out = nodes.copy()
+    out["CumulativeLoss"] = cum_cut * exp_tot
+    out["CumulativeLossPct"] = 100 * cum_cut
+    out["RoundAffected"] = first_round
+    out["Rounds"] = depth
+    return out
@@ -0,0 +1,102 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import trade_cache
+import trade_trace
+from trade_cache import DATA_PATH
+
+KEYS = ["Year", "ExporterISO", "ImporterISO"]
+
+
+def stream_chunksize():
+    """Chunk size from DPL_STREAM_CHUNKSIZE, or None to load through the cache"""
+    value = os.environ.get("DPL_STREAM_CHUNKSIZE")
+    return int(value) if value else None
+
+
+@trade_trace.traced("aggregate.stream")
+def stream_exports(path=DATA_PATH, chunksize=1_000_000,
+                   importer_col="reporterISO", exporter_col="partnerISO",
+                   year_col="Year", value_col="primaryValue", dropna=False):
+    """Fold the CSV chunk by chunk into per-(Year, Exporter, Importer) export sums
+
+    Only the four needed columns are parsed and each chunk is reduced before
+    the next one is read, so memory grows with the number of country pairs
+    per year rather than the number of rows.
+    """
+    running = None
+    reader = pd.read_csv(
+        path,
+        usecols=[importer_col, exporter_col, year_col, value_col],
+        dtype={importer_col: str, exporter_col: str},
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        chunk = pd.DataFrame({
+            "Year": pd.to_numeric(chunk[year_col], errors="coerce"),
+            "ExporterISO": chunk[exporter_col].str.upper().str.strip(),
+            "ImporterISO": chunk[importer_col].str.upper().str.strip(),
+            "Exports": pd.to_numeric(chunk[value_col], errors="coerce"),
+        })
+        if dropna:
+            chunk = chunk.dropna(subset=["Year", "Exports"])
+
+        part = chunk.groupby(KEYS, as_index=False, sort=False)["Exports"].sum()
+        if running is not None:
+            part = pd.concat([running, part], ignore_index=True)
+            part = part.groupby(KEYS, as_index=False, sort=False)["Exports"].sum()
+        running = part
+
+    if running is None:
+        return pd.DataFrame(columns=KEYS + ["Exports"])
+    running["Year"] = running["Year"].astype(np.int16)
+    return running.sort_values(KEYS).reset_index(drop=True)
+
+
+def exports_for_year(agg, year=None):
+    """The [ExporterISO, ImporterISO, Exports] frame for one year (latest by default)"""
+    if year is None:
+        year = agg["Year"].max()
+    exports = agg.loc[agg["Year"] == year, ["ExporterISO", "ImporterISO", "Exports"]]
+    return exports.sort_values(["ExporterISO", "ImporterISO"]).reset_index(drop=True)
+
+
+def _iso(s):
+    if not isinstance(s.dtype, pd.CategoricalDtype) and not pd.api.types.is_string_dtype(s):
+        s = s.astype(str)
+    return s.str.upper().str.strip()
+
+
+@trade_trace.traced("aggregate.cached")
+def cached_exports(path=DATA_PATH, importer_col="reporterISO", exporter_col="partnerISO",
+                   year_col="Year", value_col="primaryValue", dropna=False):
+    """Same frame as stream_exports, built from the columnar cache in one pass"""
+    df = trade_cache.load([importer_col, exporter_col, year_col, value_col], path=path)
+    df = pd.DataFrame({
+        "Year": pd.to_numeric(df[year_col], errors="coerce"),
+        "ExporterISO": _iso(df[exporter_col]),
+        "ImporterISO": _iso(df[importer_col]),
+        "Exports": pd.to_numeric(df[value_col], errors="coerce"),
+    })
+    if dropna:
+        df = df.dropna(subset=["Year", "Exports"])
+    agg = df.groupby(KEYS, as_index=False)["Exports"].sum()
+    agg["Year"] = agg["Year"].astype(np.int16)
+    return agg
+
+
+def source_columns(path=DATA_PATH):
+    """Column names of the source file; streaming mode reads only the header, not the cache"""
+    if stream_chunksize():
+        return list(pd.read_csv(path, nrows=0).columns)
+    return trade_cache.cached_columns(path)
+
+
+def load_exports(path=DATA_PATH, **cols):
+    """Per-(Year, Exporter, Importer) sums: streamed if DPL_STREAM_CHUNKSIZE is set, else cached"""
+    chunksize = stream_chunksize()
+    if chunksize:
+        return stream_exports(path, chunksize=chunksize, **cols)
+    return cached_exports(path, **cols)
@@ -0,0 +1,109 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+import trade_trace
+
+# values[year, exporter, importer]; years and isos are sorted, so the
+# ISO -> integer index is stable for a given set of countries.
+TradeTensor = namedtuple("TradeTensor", ["values", "years", "isos"])
+
+
+# ====== Build ======
+@trade_trace.traced("tensor.build")
+def build_tensor(agg, isos=None):
+    """Dense [year, exporter, importer] array from a Year/ExporterISO/ImporterISO/Exports frame"""
+    years = np.sort(agg["Year"].unique())
+    if isos is None:
+        isos = np.union1d(agg["ExporterISO"].astype(str).unique(),
+                          agg["ImporterISO"].astype(str).unique())
+    isos = np.asarray(isos)
+
+    y = np.searchsorted(years, agg["Year"].to_numpy())
+    e = pd.Categorical(agg["ExporterISO"].astype(str), categories=isos).codes
+    i = pd.Categorical(agg["ImporterISO"].astype(str), categories=isos).codes
+    keep = (e >= 0) & (i >= 0)
+
+    values = np.zeros((len(years), len(isos), len(isos)))
+    np.add.at(values, (y[keep], e[keep], i[keep]), agg["Exports"].to_numpy(dtype=np.float64)[keep])
+    return TradeTensor(values, years, isos)
+
+
+def iso_index(tensor):
+    """ISO code -> integer position along the exporter/importer axes"""
+    return {iso: n for n, iso in enumerate(tensor.isos)}
+
+
+def year_pos(tensor, year):
+    pos = int(np.searchsorted(tensor.years, year))
+    if pos == len(tensor.years) or tensor.years[pos] != year:
+        raise KeyError(f"Year {year} not in tensor")
+    return pos
+
+
+# ====== Metrics (all years at once) ======
+def export_totals(tensor):
+    """[year, exporter] total exports"""
+    return tensor.values.sum(axis=2)
+
+
+def import_totals(tensor):
+    """[year, importer] total imports"""
+    return tensor.values.sum(axis=1)
+
+
+def safe_divide(num, den):
+    """num / den with NaN where den is zero"""
+    return np.divide(num, den, out=np.full(num.shape, np.nan), where=den != 0)
+
+
+def export_shares(tensor):
+    """[year, exporter, importer] share of each exporter's total going to each importer"""
+    return safe_divide(tensor.values, export_totals(tensor)[:, :, None])
+
+
+def import_shares(tensor):
+    """[year, exporter, importer] share of each importer's total coming from each exporter"""
+    return safe_divide(tensor.values, import_totals(tensor)[:, None, :])
+
+
+def top_partner(tensor):
+    """[year, exporter] index of the largest destination and its share (the TDI)"""
+    idx = tensor.values.argmax(axis=2)
+    tdi = np.take_along_axis(export_shares(tensor), idx[:, :, None], axis=2)[:, :, 0]
+    return idx, tdi
+
+
+# ====== Frames ======
+def tdi_frame(tensor, year, top=None):
+    """Per-exporter top partner table for one year, in the layout question-1.py prints
+
+    `top` reuses a precomputed top_partner(tensor) result.
+    """
+    y = year_pos(tensor, year)
+    idx, tdi = top if top is not None else top_partner(tensor)
+    totals = export_totals(tensor)[y]
+    active = totals != 0
+    exporters = np.arange(len(tensor.isos))[active]
+    return pd.DataFrame({
+        "ExporterISO": tensor.isos[exporters],
+        "TopPartnerISO": tensor.isos[idx[y, exporters]],
+        "TopPartnerExports": tensor.values[y, exporters, idx[y, exporters]],
+        "TotalExports": totals[exporters],
+        "TDI": tdi[y, exporters],
+    })
+
+
+def exposure_frame(tensor, exporter, year):
+    """Importers buying from `exporter` in `year`, with their totals and import share"""
+    y = year_pos(tensor, year)
+    e = iso_index(tensor)[exporter]
+    flows = tensor.values[y, e]
+    importers = np.flatnonzero(flows)
+    return pd.DataFrame({
+        "ImporterISO": tensor.isos[importers],
+        "TradeValue": flows[importers],
+        "TotalImports": import_totals(tensor)[y, importers],
+        "Share": import_shares(tensor)[y, e, importers],
+    })
@@ -0,0 +1,163 @@
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+import trade_graph
+import trade_resilience
+import trade_stream
+import trade_tensor
+import trade_trace
+from trade_cache import CACHE_DIR, DATA_PATH
+
+STORE_DIR = os.path.join(CACHE_DIR, "timeseries")
+
+
+# ====== Metrics for any set of years ======
+@trade_trace.traced("timeseries.metrics")
+def yearly_metrics(agg, exposure_to="CHN", pivots=None):
+    """Per (Year, ISO) trade totals, TDI, exposure and centrality
+
+    Totals, TDI and the import share from `exposure_to` come from one
+    tensor pass over every year in agg; betweenness is computed per year
+    on the full network (sampled when `pivots` is given).
+    """
+    tensor = trade_tensor.build_tensor(agg)
+    n_years, n = len(tensor.years), len(tensor.isos)
+    idx, tdi = trade_tensor.top_partner(tensor)
+    exp_tot = trade_tensor.export_totals(tensor)
+    imp_tot = trade_tensor.import_totals(tensor)
+
+    index = trade_tensor.iso_index(tensor)
+    if exposure_to in index:
+        exposure = trade_tensor.import_shares(tensor)[:, index[exposure_to], :]
+    else:
+        exposure = np.zeros((n_years, n))
+
+    metrics = pd.DataFrame({
+        "Year": np.repeat(tensor.years, n),
+        "ISO": np.tile(tensor.isos, n_years),
+        "ExportsTotal": exp_tot.ravel(),
+        "ImportsTotal": imp_tot.ravel(),
+        "TopPartnerISO": tensor.isos[idx].ravel(),
+        "TDI": tdi.ravel(),
+        f"ShareFrom{exposure_to}": exposure.ravel(),
+    })
+    metrics.loc[metrics["ExportsTotal"] == 0, "TopPartnerISO"] = None
+
+    centrality = []
+    for y, year in enumerate(tensor.years):
+        A = trade_graph.positive_edges(sparse.csr_matrix(tensor.values[y]))
+        bet = trade_resilience.betweenness(trade_graph.to_networkx(A, tensor.isos), pivots)
+        _, _, deg = trade_graph.weighted_degree(A)
+        centrality.append(np.column_stack([[bet[iso] for iso in tensor.isos], deg]))
+    centrality = np.vstack(centrality)
+    metrics["Betweenness"] = centrality[:, 0]
+    metrics["DegTotal"] = centrality[:, 1]
+    return metrics[(metrics["ExportsTotal"] != 0) | (metrics["ImportsTotal"] != 0)].reset_index(drop=True)
+
+
+# ====== Incremental store ======
+def _source_id(path):
+    return hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:12]
+
+
+def _read_sources(store):
+    try:
+        with open(os.path.join(store, "sources.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _year_pairs(store, year):
+    """Pair sums for one year, summed over every ingested source"""
+    year_dir = os.path.join(store, "pairs", str(year))
+    parts = [pd.read_pickle(os.path.join(year_dir, f)) for f in sorted(os.listdir(year_dir))]
+    if not parts:
+        return None
+    pairs = pd.concat(parts, ignore_index=True)
+    return pairs.groupby(trade_stream.KEYS, as_index=False)["Exports"].sum()
+
+
+def update_store(path=DATA_PATH, store=STORE_DIR, pivots=None):
+    """Fold one Comtrade file into the per-year store; recompute only years it changed
+
+    Each file's per-year pair sums are kept separately, so a new monthly
+    file only touches the years it contains and re-ingesting an updated
+    file replaces its old contribution instead of double counting.
+    Returns the list of recomputed years.
+    """
+    sources = _read_sources(store)
+    sid = _source_id(path)
+    st = os.stat(path)
+    previous = sources.get(sid)
+    if previous and previous["size"] == st.st_size and previous["mtime_ns"] == st.st_mtime_ns:
+        return []
+
+    agg = trade_stream.load_exports(path)
+    changed = set()
+    for year, part in agg.groupby("Year"):
+        year_dir = os.path.join(store, "pairs", str(year))
+        os.makedirs(year_dir, exist_ok=True)
+        part_path = os.path.join(year_dir, f"{sid}.pkl")
+        part = part.reset_index(drop=True)
+        if os.path.exists(part_path) and pd.read_pickle(part_path).equals(part):
+            continue
+        part.to_pickle(part_path)
+        changed.add(int(year))
+
+    new_years = {int(y) for y in agg["Year"].unique()}
+    for year in set(previous["years"] if previous else []) - new_years:
+        os.remove(os.path.join(store, "pairs", str(year), f"{sid}.pkl"))
+        changed.add(year)
+
+    # One metrics pass over all changed years, then one file per year
+    metrics_dir = os.path.join(store, "metrics")
+    os.makedirs(metrics_dir, exist_ok=True)
+    pairs = [p for p in (_year_pairs(store, year) for year in sorted(changed)) if p is not None]
+    metrics = yearly_metrics(pd.concat(pairs, ignore_index=True), pivots=pivots) if pairs else None
+    for year in sorted(changed):
+        metrics_path = os.path.join(metrics_dir, f"{year}.pkl")
+        year_metrics = metrics[metrics["Year"] == year] if metrics is not None else []
+        if len(year_metrics):
+            year_metrics.reset_index(drop=True).to_pickle(metrics_path)
+        elif os.path.exists(metrics_path):
+            os.remove(metrics_path)
+
+    sources[sid] = {"path": os.path.abspath(path), "size": st.st_size,
+                    "mtime_ns": st.st_mtime_ns, "years": sorted(new_years)}
+    with open(os.path.join(store, "sources.json"), "w") as f:
+        json.dump(sources, f, indent=2)
+    return sorted(changed)
+
+
+def load_timeseries(store=STORE_DIR):
+    """All stored per-year metrics as one frame"""
+    metrics_dir = os.path.join(store, "metrics")
+    files = sorted(os.listdir(metrics_dir)) if os.path.isdir(metrics_dir) else []
+    if not files:
+        return pd.DataFrame()
+    return pd.concat([pd.read_pickle(os.path.join(metrics_dir, f)) for f in files], ignore_index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="All-years trade metrics with incremental updates")
+    parser.add_argument("files", nargs="*", default=[DATA_PATH], help="Comtrade CSV files to fold in")
+    parser.add_argument("--store", default=STORE_DIR)
+    parser.add_argument("--pivots", type=int, help="sample this many pivots for betweenness")
+    parser.add_argument("--iso", action="append", help="countries to print trends for")
+    args = parser.parse_args()
+
+    for path in args.files:
+        years = update_store(path, args.store, args.pivots)
+        print(f"{path}: recomputed {len(years)} year(s) {years}")
+
+    series = load_timeseries(args.store)
+    if args.iso:
+        series = series[series["ISO"].isin(args.iso)]
+    print(series.pivot(index="Year", columns="ISO", values="TDI").round(3).iloc[:, :10])
@@ -0,0 +1,154 @@
+import atexit
+import cProfile
+import functools
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# DPL_TRACE=trace.jsonl turns tracing on; DPL_PROFILE_DIR=profiles/ also dumps cProfile stats per stage
+TRACE_PATH = os.environ.get("DPL_TRACE")
+PROFILE_DIR = os.environ.get("DPL_PROFILE_DIR")
+ENABLED = bool(TRACE_PATH or PROFILE_DIR)
+
+_records = []
+_flushed = 0
+_depth = 0
+
+
+class StageRecord:
+    """Mutable record a stage body can fill in (rows_out, extra fields)"""
+
+    __slots__ = ("name", "rows_in", "rows_out", "extra")
+
+    def __init__(self, name, rows_in=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.extra = {}
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def _rows(obj):
+    """Row count of frames and arrays; None for anything else"""
+    shape = getattr(obj, "shape", None)
+    return int(shape[0]) if shape else None
+
+
+@contextmanager
+def stage(name, rows_in=None):
+    """Time one pipeline stage: wall, CPU, peak RSS growth and row counts"""
+    record = StageRecord(name, rows_in)
+    if not ENABLED:
+        yield record
+        return
+
+    global _depth
+    # Only outermost stages are profiled: nested ones show up inside them, and
+    # newer Pythons refuse to run two profilers at once
+    profiler = cProfile.Profile() if PROFILE_DIR and _depth == 0 else None
+    rss_before = _peak_rss_mb()
+    wall, cpu = time.perf_counter(), time.process_time()
+    _depth += 1
+    if profiler:
+        profiler.enable()
+    try:
+        yield record
+    finally:
+        if profiler:
+            profiler.disable()
+        _depth -= 1
+        rss_after = _peak_rss_mb()
+        entry = {
+            "stage": name,
+            "depth": _depth,
+            "wall_s": round(time.perf_counter() - wall, 6),
+            "cpu_s": round(time.process_time() - cpu, 6),
+            "peak_rss_delta_mb": None if rss_before is None else round(rss_after - rss_before, 3),
+            "peak_rss_mb": None if rss_after is None else round(rss_after, 3),
+            "rows_in": record.rows_in,
+            "rows_out": record.rows_out,
+            **record.extra,
+        }
+        if profiler:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            dump = os.path.join(PROFILE_DIR, f"{os.getpid()}-{len(_records):03d}-{name}.prof")
+            profiler.dump_stats(dump)
+            entry["profile"] = dump
+        _records.append(entry)
+
+
+def traced(name):
+    """Decorator form of stage(); rows_in from the first argument, rows_out from the result"""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with stage(name, _rows(args[0]) if args else None) as record:
+                result = fn(*args, **kwargs)
+                record.rows_out = _rows(result)
+            return result
+        return inner
+    return wrap
+
+
+def worker_task(fn):
+    """Decorator for process-pool task functions: flush the worker's stages after every task"""
+    @functools.wraps(fn)
+    def inner(*args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            flush()
+    return inner
+
+
+def records():
+    return list(_records)
+
+
+def flush(path=None):
+    """Append stages recorded since the last flush to the trace, one JSON line each
+
+    Every process appends on its own, so concurrent runs and pool workers
+    never overwrite each other. Workers do not run atexit hooks, so pool
+    tasks call this when they finish.
+    """
+    global _flushed
+    path = path or TRACE_PATH
+    if not path or _flushed == len(_records):
+        return
+    run = {"started": _started, "argv": sys.argv, "pid": os.getpid()}
+    lines = "".join(json.dumps({**run, **entry}) + "\n" for entry in _records[_flushed:])
+    with open(path, "a") as f:
+        f.write(lines)
+    _flushed = len(_records)
+
+
+def _reset_in_child():
+    # A forked child inherits the parent's unflushed stages (the parent writes
+    # those) and its open-stage depth; the child's own stages start at the top
+    global _flushed, _depth
+    _flushed = len(_records)
+    _depth = 0
+
+
+_started = datetime.now(timezone.utc).isoformat(timespec="seconds")
+if TRACE_PATH:
+    atexit.register(flush)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_reset_in_child)
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+# Parameter uncertainty around each country's point inputs (standard deviations)
+DEFAULT_SPREAD = {
+    "base_youth_unemployment": 2.0,  # percentage points
+    "gdp_growth": 1.0,               # percentage points
+    "gdp_shock": 1.0,                # around the slowdown
+    "econ_structure": 0.1,           # score in [0, 1]
+    "education": 0.1,                # score in [0, 1]
+}
+
+
+def unemployment_model(base_rate, gdp_growth, economic_structure_score, education_score):
+    """Array version of the question-4,5,6.py model; broadcasts over any shapes"""
+    unemployment_change = (
+        -0.5 * gdp_growth +
+        0.3 * (1 - economic_structure_score) +
+        -0.2 * education_score
+    )
+    return np.maximum(0, base_rate + unemployment_change)
+
+
+def simulate(countries, draws=1_000_000, slowdown=-2.0, threshold=25.0, spread=None,
+             seed=42, max_cells=20_000_000, offset=0):
+    """Monte Carlo 2030 youth unemployment for every country in one batch
+
+    Every country gets `draws` samples of base rate, GDP growth, slowdown
+    shock, structure and education score; the model is evaluated as one
+    [country, draw] array. Countries are processed in blocks of at most
+    `max_cells` samples so memory stays bounded while percentiles stay exact.
+
+    Each country draws from its own stream, seeded by `seed` and its
+    position (`offset` + row), so splitting the list into batches with the
+    matching offsets reproduces the same samples.
+
+    Returns one row per country with the probability of exceeding
+    `threshold` and the P5/P50/P95 band.
+    """
+    spread = {**DEFAULT_SPREAD, **(spread or {})}
+    frame = pd.DataFrame(countries)
+    block = max(1, max_cells // draws)
+
+    results = []
+    for start in range(0, len(frame), block):
+        part = frame.iloc[start:start + block]
+        rngs = [np.random.default_rng([seed, offset + start + i]) for i in range(len(part))]
+
+        def sample(col, sd, lo=None, hi=None):
+            means = part[col].to_numpy(dtype=np.float64) if col else np.full(len(part), slowdown)
+            values = np.stack([rng.normal(m, sd, draws) for rng, m in zip(rngs, means)])
+            return np.clip(values, lo, hi) if lo is not None else values
+
+        gdp = sample("gdp_growth", spread["gdp_growth"]) + sample(None, spread["gdp_shock"])
+        rates = unemployment_model(
+            np.maximum(0, sample("base_youth_unemployment", spread["base_youth_unemployment"])),
+            gdp,
+            sample("econ_structure", spread["econ_structure"], 0, 1),
+            sample("education", spread["education"], 0, 1),
+        )
+        p5, p50, p95 = np.percentile(rates, [5, 50, 95], axis=1)
+        results.append(pd.DataFrame({
+            "country": part["country"].to_numpy(),
+            "current_rate": part["base_youth_unemployment"].to_numpy(),
+            "mean": rates.mean(axis=1),
+            "p5": p5, "p50": p50, "p95": p95,
+            "p_exceed": (rates > threshold).mean(axis=1),
+        }))
+    return pd.concat(results, ignore_index=True)